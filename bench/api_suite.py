@@ -0,0 +1,208 @@
+"""
+End-to-end API benchmark: seeds a dataset with api.seed, then drives the
+real routes in-process (Flask test client, no network) with a weighted mix
+of logins, plan lists, votes, expense summaries and group lists.
+
+For every route it reports p50/p95/p99 latency and queries per request,
+then checks them against bench/budgets.json (absolute limits) and against
+the stored baseline for that database (bench/baselines/<db>.json, with the
+tolerance from budgets.json). Any breach makes the exit status 1.
+
+    $ python bench/api_suite.py                                  # SQLite in a temp dir
+    $ python bench/api_suite.py --db postgresql --postgres-url postgresql://localhost/amigoplan_bench
+    $ python bench/api_suite.py --db sqlite,postgresql --scale 5 --requests 2000
+    $ python bench/api_suite.py --save-baseline                  # after an intended change
+
+--db postgresql DROPS AND RECREATES every table at --postgres-url (or
+$BENCH_POSTGRES_URL), so point it at a throwaway database.
+"""
+import argparse
+import json
+import os
+import random
+import statistics
+import subprocess
+import sys
+import tempfile
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+HERE      = os.path.dirname(os.path.abspath(__file__))
+BUDGETS   = os.path.join(HERE, "budgets.json")
+BASELINES = os.path.join(HERE, "baselines")
+
+# route label -> weight in the mix
+WORKLOAD = {
+    "POST /auth/login":                  5,
+    "GET /plans":                        25,
+    "GET /groups/<id>/plans":            10,
+    "POST /plans/<id>/vote":             15,
+    "GET /plans/<id>/expenses/summary":  15,
+    "GET /groups":                       20,
+}
+
+
+def percentiles(samples):
+    q = statistics.quantiles(samples, n=100, method="inclusive") if len(samples) > 1 else samples * 99
+    return {"p50_ms": round(q[49] * 1000, 2), "p95_ms": round(q[94] * 1000, 2), "p99_ms": round(q[98] * 1000, 2)}
+
+
+def run(db_name, args):
+    """Seed, run the mix and return {route: stats} for one database."""
+    if db_name == "sqlite":
+        url = "sqlite:///" + os.path.join(tempfile.mkdtemp(prefix="amigoplan-bench-"), "bench.db")
+    else:
+        url = args.postgres_url or os.getenv("BENCH_POSTGRES_URL")
+        if not url:
+            sys.exit("--db postgresql needs --postgres-url or BENCH_POSTGRES_URL")
+    os.environ["DATABASE_URL"] = url
+    sys.path.insert(0, os.path.join(HERE, "..", "src"))
+
+    from flask_jwt_extended import create_access_token
+    from sqlalchemy import event, select
+    from app import app
+    from api.models import db, Plan, group_members
+    from api.seed import seed, SEED_PASSWORD
+
+    local = threading.local()
+
+    with app.app_context():
+        db.drop_all()
+        db.create_all()
+        started = time.perf_counter()
+        counts  = seed(args.scale, args.seed)
+        print(f"[{db_name}] seeded {sum(counts.values())} rows in {time.perf_counter() - started:.1f}s")
+        memberships = db.session.execute(select(group_members.c.user_id, group_members.c.group_id)).all()
+        plans       = dict(db.session.execute(select(Plan.id, Plan.group_id)).all())
+        emails      = dict(db.session.execute(select(db.metadata.tables["user"].c.id,
+                                                     db.metadata.tables["user"].c.email)).all())
+        tokens      = {uid: create_access_token(identity=str(uid)) for uid, _ in memberships}
+
+        @event.listens_for(db.engine, "before_cursor_execute")
+        def count_query(conn, cursor, statement, parameters, context, executemany):
+            local.queries = getattr(local, "queries", 0) + 1
+
+    plans_by_group = {}
+    for pid, gid in plans.items():
+        plans_by_group.setdefault(gid, []).append(pid)
+    memberships = [(uid, gid) for uid, gid in memberships if gid in plans_by_group]
+    rnd         = random.Random(args.seed)
+    routes      = list(WORKLOAD)
+    mix         = rnd.choices(routes, weights=list(WORKLOAD.values()), k=args.warmup + args.requests)
+    picks       = [rnd.choice(memberships) for _ in mix]
+
+    def request(i):
+        route, (uid, gid) = mix[i], picks[i]
+        pid     = plans_by_group[gid][i % len(plans_by_group[gid])]
+        headers = {"Authorization": f"Bearer {tokens[uid]}"}
+        client  = app.test_client()
+        local.queries = 0
+        start = time.perf_counter()
+        if route == "POST /auth/login":
+            r = client.post("/api/auth/login", json={"email": emails[uid], "password": SEED_PASSWORD})
+        elif route == "GET /plans":
+            r = client.get("/api/plans", headers=headers)
+        elif route == "GET /groups/<id>/plans":
+            r = client.get(f"/api/groups/{gid}/plans", headers=headers)
+        elif route == "POST /plans/<id>/vote":
+            r = client.post(f"/api/plans/{pid}/vote", headers=headers,
+                            json={"vote_type": ("si", "no", "me_da_igual")[i % 3]})
+        elif route == "GET /plans/<id>/expenses/summary":
+            r = client.get(f"/api/plans/{pid}/expenses/summary", headers=headers)
+        else:
+            r = client.get("/api/groups", headers=headers)
+        return route, time.perf_counter() - start, local.queries, r.status_code < 400
+
+    with ThreadPoolExecutor(args.concurrency) as pool:
+        list(pool.map(request, range(args.warmup)))
+        started = time.perf_counter()
+        results = list(pool.map(request, range(args.warmup, args.warmup + args.requests)))
+        elapsed = time.perf_counter() - started
+
+    stats = {}
+    for route in routes:
+        samples = [r for r in results if r[0] == route]
+        if not samples:
+            continue
+        queries = [q for _, _, q, _ in samples]
+        stats[route] = {"n": len(samples), "errors": sum(not ok for *_, ok in samples),
+                        **percentiles([t for _, t, _, _ in samples]),
+                        "queries_mean": round(statistics.fmean(queries), 2), "queries_max": max(queries)}
+    print(f"[{db_name}] {args.requests} requests, concurrency {args.concurrency}, "
+          f"{args.requests / elapsed:.0f} req/s")
+    return stats
+
+
+def check(db_name, stats, budgets, baseline):
+    """Print the report and return the list of breaches."""
+    tolerance = budgets.get("tolerance", 0.3)
+    breaches  = []
+    print(f"{'route':<34} {'n':>5} {'err':>4} {'p50':>8} {'p95':>8} {'p99':>8} {'queries':>8}")
+    for route, s in stats.items():
+        print(f"{route:<34} {s['n']:>5} {s['errors']:>4} {s['p50_ms']:>6.1f}ms {s['p95_ms']:>6.1f}ms "
+              f"{s['p99_ms']:>6.1f}ms {s['queries_mean']:>5.1f}/{s['queries_max']}")
+        limit = budgets["routes"].get(route, {})
+        base  = baseline.get(route)
+        if s["errors"]:
+            breaches.append(f"{route}: {s['errors']} failed requests")
+        if "p95_ms" in limit and s["p95_ms"] > limit["p95_ms"]:
+            breaches.append(f"{route}: p95 {s['p95_ms']:.1f}ms > budget {limit['p95_ms']}ms")
+        if "queries" in limit and s["queries_max"] > limit["queries"]:
+            breaches.append(f"{route}: {s['queries_max']} queries > budget {limit['queries']}")
+        if base and s["p95_ms"] > base["p95_ms"] * (1 + tolerance):
+            breaches.append(f"{route}: p95 {s['p95_ms']:.1f}ms > baseline {base['p95_ms']:.1f}ms +{tolerance:.0%}")
+        if base and s["queries_max"] > base["queries_max"]:
+            breaches.append(f"{route}: {s['queries_max']} queries > baseline {base['queries_max']}")
+    for line in breaches:
+        print(f"REGRESSION [{db_name}] {line}")
+    return breaches
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--db", default="sqlite", help="sqlite, postgresql or both comma-separated")
+    parser.add_argument("--postgres-url", default=None)
+    parser.add_argument("--scale", type=int, default=1)
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--requests", type=int, default=1000)
+    parser.add_argument("--warmup", type=int, default=100)
+    parser.add_argument("--concurrency", type=int, default=4)
+    parser.add_argument("--save-baseline", action="store_true", help="store these results as the new baseline")
+    args = parser.parse_args()
+
+    targets = [name.strip() for name in args.db.split(",") if name.strip()]
+    if len(targets) > 1:
+        # One process per database: the app binds DATABASE_URL at import time
+        argv, skip = [], False
+        for arg in sys.argv[1:]:
+            if not skip and not arg.startswith("--db"):
+                argv.append(arg)
+            skip = arg == "--db"
+        codes = [subprocess.call([sys.executable, __file__, "--db", name] + argv) for name in targets]
+        sys.exit(max(codes))
+    db_name = targets[0]
+    if db_name not in ("sqlite", "postgresql"):
+        sys.exit(f"unknown --db {db_name}")
+
+    stats = run(db_name, args)
+    with open(BUDGETS) as f:
+        budgets = json.load(f)
+    path     = os.path.join(BASELINES, f"{db_name}.json")
+    baseline = {}
+    if os.path.exists(path) and not args.save_baseline:
+        with open(path) as f:
+            baseline = json.load(f)["routes"]
+    breaches = check(db_name, stats, budgets, baseline)
+    if args.save_baseline:
+        os.makedirs(BASELINES, exist_ok=True)
+        with open(path, "w") as f:
+            json.dump({"scale": args.scale, "seed": args.seed, "requests": args.requests,
+                       "concurrency": args.concurrency, "routes": stats}, f, indent=2, sort_keys=True)
+            f.write("\n")
+        print(f"baseline saved to {os.path.relpath(path)}")
+    sys.exit(1 if breaches else 0)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,85 @@
+"""
+Login burst benchmark: hammers POST /api/auth/login from many threads while
+timing a cheap authenticated endpoint (/api/auth/me) alongside, so you can
+see both the login p99 and how much the KDF work slows down everything else.
+
+    $ pipenv run start                       # or gunicorn, in another shell
+    $ python bench/login_load.py --url http://localhost:3001 --concurrency 32 --requests 400
+"""
+import argparse
+import statistics
+import threading
+import time
+import uuid
+from concurrent.futures import ThreadPoolExecutor
+
+import requests
+
+
+def percentiles(samples):
+    if not samples:
+        return {}
+    q = statistics.quantiles(samples, n=100, method="inclusive")
+    return {"p50": q[49], "p95": q[94], "p99": q[98], "max": max(samples)}
+
+
+def report(name, samples, errors):
+    stats = percentiles(samples)
+    line  = "  ".join(f"{k}={v * 1000:7.1f}ms" for k, v in stats.items())
+    print(f"{name:<14} n={len(samples):<5} errors={errors:<4} {line}")
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--url", default="http://localhost:3001")
+    parser.add_argument("--concurrency", type=int, default=16)
+    parser.add_argument("--requests", type=int, default=200)
+    args = parser.parse_args()
+
+    api      = args.url.rstrip("/") + "/api"
+    email    = f"bench-{uuid.uuid4().hex[:8]}@bench.local"
+    password = "bench-password"
+    r = requests.post(f"{api}/auth/register", json={"email": email, "username": email.split("@")[0], "password": password})
+    r.raise_for_status()
+    token = r.json()["token"]
+
+    logins, login_errors = [], 0
+    probes, probe_errors = [], 0
+    done = threading.Event()
+    lock = threading.Lock()
+
+    def login(_):
+        nonlocal login_errors
+        start = time.perf_counter()
+        ok    = requests.post(f"{api}/auth/login", json={"email": email, "password": password}).ok
+        with lock:
+            logins.append(time.perf_counter() - start)
+            login_errors += not ok
+
+    def probe():
+        nonlocal probe_errors
+        session = requests.Session()
+        while not done.is_set():
+            start = time.perf_counter()
+            ok    = session.get(f"{api}/auth/me", headers={"Authorization": f"Bearer {token}"}).ok
+            with lock:
+                probes.append(time.perf_counter() - start)
+                probe_errors += not ok
+            time.sleep(0.05)
+
+    prober = threading.Thread(target=probe)
+    prober.start()
+    started = time.perf_counter()
+    with ThreadPoolExecutor(args.concurrency) as pool:
+        list(pool.map(login, range(args.requests)))
+    elapsed = time.perf_counter() - started
+    done.set()
+    prober.join()
+
+    print(f"{args.requests} logins, concurrency {args.concurrency}, {args.requests / elapsed:.1f} logins/s")
+    report("POST login", logins, login_errors)
+    report("GET auth/me", probes, probe_errors)
+
+
+if __name__ == "__main__":
+    main()
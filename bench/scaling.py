@@ -0,0 +1,154 @@
+"""
+Throughput vs worker count under the production profile (gunicorn.conf.py).
+
+Seeds a database with flask seed, then for each --workers value starts
+gunicorn -c gunicorn.conf.py with WEB_CONCURRENCY set to it, waits for
+/readyz and drives a read-heavy mix (plan lists, groups, expense summaries)
+from --concurrency client threads for --duration seconds. The report shows
+req/s per worker count, the speedup over the first count, and the
+efficiency (speedup / workers). Throughput should grow with workers up to
+the number of cores.
+
+    $ python bench/scaling.py                                 # 1, 2, 4... up to the core count
+    $ python bench/scaling.py --workers 1,2,4,8 --threads 4 --duration 20
+    $ python bench/scaling.py --database-url postgresql://localhost/amigoplan_bench
+
+The client runs on the same machine, so leave it a core or use
+--concurrency to keep it from being the bottleneck. --database-url is
+seeded from scratch: point it at a throwaway database.
+"""
+import argparse
+import os
+import random
+import socket
+import statistics
+import subprocess
+import sys
+import tempfile
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+import requests
+
+HERE = os.path.dirname(os.path.abspath(__file__))
+ROOT = os.path.join(HERE, "..")
+sys.path.insert(0, os.path.join(ROOT, "src"))
+
+from api.seed import NAMES, SEED_PASSWORD  # noqa: E402
+
+PATHS = ["/api/plans", "/api/groups", "/api/groups/{gid}/plans", "/api/plans/{pid}/expenses/summary"]
+
+
+def free_port():
+    with socket.socket() as s:
+        s.bind(("127.0.0.1", 0))
+        return s.getsockname()[1]
+
+
+def start_server(env, workers, threads):
+    port   = free_port()
+    server = subprocess.Popen([sys.executable, "-m", "gunicorn", "-c", "gunicorn.conf.py",
+                               "--bind", f"127.0.0.1:{port}", "--access-logfile", "/dev/null"],
+                              cwd=ROOT, env={**env, "WEB_CONCURRENCY": str(workers), "GUNICORN_THREADS": str(threads)},
+                              stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL)
+    url      = f"http://127.0.0.1:{port}"
+    deadline = time.monotonic() + 60
+    while time.monotonic() < deadline:
+        try:
+            if requests.get(url + "/readyz", timeout=5).ok:
+                return server, url
+        except requests.RequestException:
+            pass
+        time.sleep(0.2)
+    server.kill()
+    sys.exit(f"gunicorn with {workers} workers did not become ready")
+
+
+def login(url, uid):
+    email = f"{NAMES[uid % len(NAMES)]}{uid}@seed.amigoplan.dev"
+    r     = requests.post(url + "/api/auth/login", json={"email": email, "password": SEED_PASSWORD}, timeout=30)
+    r.raise_for_status()
+    return r.json()["token"]
+
+
+def drive(url, tokens, duration, concurrency):
+    """Hit the mix for duration seconds; returns (latencies, errors)."""
+    latencies, errors, lock = [], [0], threading.Lock()
+    deadline = time.monotonic() + duration
+
+    def client(n):
+        rnd     = random.Random(n)
+        session = requests.Session()
+        while time.monotonic() < deadline:
+            token, gid, pid = rnd.choice(tokens)
+            path  = rnd.choice(PATHS).format(gid=gid, pid=pid)
+            start = time.perf_counter()
+            try:
+                ok = session.get(url + path, headers={"Authorization": f"Bearer {token}"}, timeout=30).ok
+            except requests.RequestException:
+                ok = False
+            elapsed = time.perf_counter() - start
+            with lock:
+                latencies.append(elapsed)
+                errors[0] += not ok
+
+    with ThreadPoolExecutor(concurrency) as pool:
+        list(pool.map(client, range(concurrency)))
+    return latencies, errors[0]
+
+
+def main():
+    cores = os.cpu_count() or 1
+    steps = [n for n in (1, 2, 4, 8, 16, 32) if n <= cores] + ([cores] if cores & (cores - 1) else [])
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--workers", default=",".join(map(str, steps)), help="comma-separated worker counts")
+    parser.add_argument("--threads", type=int, default=8)
+    parser.add_argument("--concurrency", type=int, default=32, help="client threads")
+    parser.add_argument("--duration", type=float, default=10, help="seconds per worker count")
+    parser.add_argument("--scale", type=int, default=1)
+    parser.add_argument("--users", type=int, default=40, help="distinct users logged in for the mix")
+    parser.add_argument("--database-url", default=None)
+    args = parser.parse_args()
+
+    env = dict(os.environ, FLASK_APP="src/app.py", FLASK_DEBUG="0",
+               DATABASE_URL=args.database_url or
+               "sqlite:///" + os.path.join(tempfile.mkdtemp(prefix="amigoplan-scaling-"), "bench.db"))
+    subprocess.run([sys.executable, "-m", "flask", "seed", "--scale", str(args.scale), "--reset"],
+                   cwd=ROOT, env=env, check=True, stdout=subprocess.DEVNULL)
+
+    from sqlalchemy import create_engine, text
+    engine = create_engine(env["DATABASE_URL"])
+    with engine.connect() as conn:
+        picks = conn.execute(text(
+            "SELECT gm.user_id, gm.group_id, MIN(p.id) FROM group_members gm "
+            "JOIN plan p ON p.group_id = gm.group_id GROUP BY gm.user_id, gm.group_id "
+            "ORDER BY gm.user_id LIMIT :n"), {"n": args.users}).all()
+    engine.dispose()
+
+    results = []
+    for workers in [int(n) for n in args.workers.split(",")]:
+        server, url = start_server(env, workers, args.threads)
+        try:
+            tokens = {uid: login(url, uid) for uid in {uid for uid, _, _ in picks}}
+            mix    = [(tokens[uid], gid, pid) for uid, gid, pid in picks]
+            drive(url, mix, min(2, args.duration), args.concurrency)  # warm every worker
+            latencies, errors = drive(url, mix, args.duration, args.concurrency)
+        finally:
+            server.terminate()
+            server.wait()
+        q = statistics.quantiles(latencies, n=100, method="inclusive")
+        results.append((workers, len(latencies) / args.duration, q[49] * 1000, q[94] * 1000, errors))
+        print(f"{workers} workers: {results[-1][1]:.0f} req/s", flush=True)
+
+    print(f"\n{'workers':>7} {'req/s':>8} {'speedup':>8} {'efficiency':>10} {'p50':>8} {'p95':>8} {'errors':>7}"
+          f"   ({cores} cores, {args.threads} threads/worker, {args.concurrency} clients)")
+    first_workers, first_rps = results[0][:2]
+    for workers, rps, p50, p95, errors in results:
+        speedup = rps / first_rps
+        print(f"{workers:>7} {rps:>8.0f} {speedup:>7.2f}x {speedup * first_workers / workers:>9.0%} "
+              f"{p50:>6.1f}ms {p95:>6.1f}ms {errors:>7}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,91 @@
+"""
+Serialization benchmark: model.serialize() + jsonify against the compiled
+schemas in api.serializers. Plans and expenses are written to an in-memory
+SQLite database and loaded the way the routes load them, so only the
+serialization is timed. Each payload is checked to be byte-identical first.
+
+    $ python bench/serialize.py --rows 5000 --repeat 5
+    $ python bench/serialize.py --no-orjson            # stdlib fallback only
+"""
+import argparse
+import os
+import random
+import sys
+import time
+from datetime import datetime, timedelta
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), "..", "src"))
+
+from flask import Flask, jsonify
+from sqlalchemy.orm import selectinload, joinedload
+
+from api import serializers
+from api.models import db, User, Group, Plan, Expense, ExpenseSplit, PlanStatus, SplitType
+from api.queries import plan_query
+from api.serializers import json_response, serialize_all
+
+
+def populate(n, rnd):
+    users = [User(id=i, username=f"user{i}", email=f"user{i}@x.com", password="x") for i in range(1, 51)]
+    group = Group(id=1, name="Bench", admin_id=1)
+    start = datetime(2026, 1, 1)
+    db.session.add_all(users + [group])
+    for i in range(1, n + 1):
+        db.session.add(Plan(
+            id=i, title=f"Plan {i}", description="Cena y luego cine en Logroño. " * rnd.randint(0, 3),
+            group_id=1, organizer_id=rnd.randint(1, 50), admin_id=rnd.randint(1, 50),
+            status=rnd.choice(list(PlanStatus)),
+            scheduled_date=start + timedelta(days=rnd.randint(0, 300)) if rnd.random() < 0.7 else None,
+            rating=round(rnd.uniform(1, 5), 1) if rnd.random() < 0.5 else None,
+            created_at=start + timedelta(seconds=i * 37, microseconds=rnd.randint(0, 999999)),
+        ))
+    for i in range(1, n // 5 + 1):
+        total = round(rnd.uniform(5, 300), 2)
+        payer = rnd.randint(1, 8)
+        db.session.add(Expense(
+            id=i, plan_id=1, description=f"Gasto {i}", total_amount=total, paid_by_id=payer,
+            split_type=SplitType.IGUAL, created_at=start + timedelta(minutes=i),
+            splits=[ExpenseSplit(user_id=u, amount=round(total / 8, 2), is_paid=u == payer) for u in range(1, 9)]))
+    db.session.commit()
+
+
+def timed(fn, repeat):
+    best = float("inf")
+    for _ in range(repeat):
+        t0   = time.perf_counter()
+        body = fn()
+        best = min(best, time.perf_counter() - t0)
+    return best, body
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--rows", type=int, default=5000)
+    parser.add_argument("--repeat", type=int, default=5)
+    parser.add_argument("--seed", type=int, default=1)
+    parser.add_argument("--no-orjson", action="store_true", help="force the stdlib fallback")
+    args = parser.parse_args()
+    if args.no_orjson:
+        serializers.orjson = None
+
+    app = Flask(__name__)
+    app.config["SQLALCHEMY_DATABASE_URI"] = "sqlite://"
+    db.init_app(app)
+    print(f"backend: {'orjson' if serializers.orjson else 'stdlib json'}   rows: {args.rows}")
+    with app.app_context():
+        db.create_all()
+        populate(args.rows, random.Random(args.seed))
+        plans    = plan_query("plan_list").order_by(Plan.created_at.desc()).all()
+        expenses = (Expense.query.options(joinedload(Expense.paid_by),
+                                          selectinload(Expense.splits).joinedload(ExpenseSplit.user)).all())
+        for name, model, rows in [("plans", Plan, plans), ("expenses", Expense, expenses)]:
+            old, old_body = timed(lambda: jsonify([r.serialize() for r in rows]).get_data(), args.repeat)
+            new, new_body = timed(lambda: json_response(serialize_all(model, rows)).get_data(), args.repeat)
+            if old_body != new_body:
+                sys.exit(f"{name}: output differs from jsonify")
+            print(f"{name:<9} n={len(rows):<6} serialize()+jsonify {old * 1000:8.1f}ms   "
+                  f"compiled {new * 1000:8.1f}ms   x{old / new:4.1f}   {len(new_body)} bytes identical")
+
+
+if __name__ == "__main__":
+    main()
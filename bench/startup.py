@@ -0,0 +1,87 @@
+"""
+Worker startup profile: how long a fresh process takes to import the app and
+answer its first request, and which imports that time goes to.
+
+Each run is a new interpreter (like a new gunicorn worker) started with
+python -X importtime. It imports src/app.py, then sends one login through
+the test client, which opens the first DB connection. The report shows the
+median of the runs, the packages with the most import time, and checks the
+totals against "startup" in bench/budgets.json. Any breach makes the exit
+status 1.
+
+    $ python bench/startup.py
+    $ python bench/startup.py --runs 10 --top 25
+    $ API_ONLY=1 python bench/startup.py     # the env is passed to each run
+"""
+import argparse
+import json
+import os
+import re
+import statistics
+import subprocess
+import sys
+import tempfile
+
+HERE    = os.path.dirname(os.path.abspath(__file__))
+SRC     = os.path.join(HERE, "..", "src")
+BUDGETS = os.path.join(HERE, "budgets.json")
+
+# Runs inside the child: prints {"import_ms", "first_request_ms"} on stdout
+CHILD = """
+import json, time
+started = time.perf_counter()
+from app import app
+imported = time.perf_counter()
+app.test_client().post("/api/auth/login", json={"email": "nobody@startup.bench", "password": "x"})
+print(json.dumps({"import_ms": (imported - started) * 1000,
+                  "first_request_ms": (time.perf_counter() - imported) * 1000}))
+"""
+IMPORTTIME = re.compile(r"import time:\s+(\d+) \|\s+(\d+) \|( *)(\S+)")
+
+
+def run_once(env):
+    child = subprocess.run([sys.executable, "-X", "importtime", "-c", CHILD], cwd=SRC, env=env,
+                           capture_output=True, text=True)
+    if child.returncode:
+        sys.exit(child.stderr)
+    times   = json.loads(child.stdout.strip().splitlines()[-1])
+    modules = {}
+    for self_us, _, _, name in IMPORTTIME.findall(child.stderr):
+        package = name.split(".")[0]
+        modules[package] = modules.get(package, 0) + int(self_us) / 1000
+    return times, modules
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--runs", type=int, default=5)
+    parser.add_argument("--top", type=int, default=15, help="packages to list by import time")
+    args = parser.parse_args()
+
+    env = dict(os.environ)
+    env.setdefault("DATABASE_URL", "sqlite:///" + os.path.join(tempfile.mkdtemp(prefix="amigoplan-startup-"), "s.db"))
+    env.pop("FLASK_RUN_FROM_CLI", None)
+
+    runs    = [run_once(env) for _ in range(args.runs)]
+    totals  = {key: statistics.median(t[key] for t, _ in runs) for key in ("import_ms", "first_request_ms")}
+    totals["total_ms"] = totals["import_ms"] + totals["first_request_ms"]
+    modules = {name: statistics.median(m.get(name, 0) for _, m in runs) for name in runs[0][1]}
+
+    print(f"{'package':<28} {'import ms':>10}   (self time summed per top-level package, median of {args.runs})")
+    for name, ms in sorted(modules.items(), key=lambda item: -item[1])[:args.top]:
+        print(f"{name:<28} {ms:>10.1f}")
+    print()
+    for key, ms in totals.items():
+        print(f"{key:<28} {ms:>10.1f}")
+
+    with open(BUDGETS) as f:
+        budget = json.load(f).get("startup", {})
+    breaches = [f"{key} {totals[key]:.0f}ms > budget {limit}ms"
+                for key, limit in budget.items() if totals.get(key, 0) > limit]
+    for line in breaches:
+        print(f"REGRESSION [startup] {line}")
+    sys.exit(1 if breaches else 0)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,58 @@
+"""
+Production gunicorn settings: gunicorn -c gunicorn.conf.py
+
+Workers default to one per core (WEB_CONCURRENCY). Each one runs
+GUNICORN_THREADS threads (gthread), so a slow Ticketmaster call, a password
+hash or an open event stream holds one thread rather than the whole worker.
+GUNICORN_WORKER_CLASS=gevent is opt-in only: psycopg2 is not made
+cooperative here, so without psycogreen every query blocks the worker's
+whole event loop.
+
+Live updates (/api/plans/<id>/events) need BROKER_URL (Redis) to reach
+every worker. Without it each worker's streams only see the votes that
+worker handled, and a warning says so at startup. Each open stream keeps a
+thread busy for up to SSE_MAX_SECONDS, so SSE_MAX_STREAMS defaults to half
+the threads and the other half always serve the API.
+
+The app sizes its SQLAlchemy pool to the threads of one worker
+(DB_POOL_SIZE), so workers x pool must stay under the database's
+max_connections.
+"""
+import multiprocessing
+import os
+
+wsgi_app = "wsgi:application"
+chdir    = os.path.join(os.path.dirname(os.path.abspath(__file__)), "src")
+bind     = f"0.0.0.0:{os.getenv('PORT', 3001)}"
+
+worker_class       = os.getenv("GUNICORN_WORKER_CLASS", "gthread")
+workers            = int(os.getenv("WEB_CONCURRENCY", multiprocessing.cpu_count()))
+threads            = int(os.getenv("GUNICORN_THREADS", 8))
+worker_connections = int(os.getenv("GUNICORN_CONNECTIONS", 200))  # gevent only
+
+timeout          = int(os.getenv("GUNICORN_TIMEOUT", 30))
+graceful_timeout = 20
+keepalive        = 5
+max_requests        = 2000  # recycle workers now and then, staggered
+max_requests_jitter = 200
+
+accesslog = "-"
+errorlog  = "-"
+# %(U)s is the path without the query string: EventSource sends ?jwt=<token>
+access_log_format = '%(h)s %(l)s %(u)s %(t)s "%(m)s %(U)s %(H)s" %(s)s %(b)s "%(a)s" %(M)sms'
+
+# Read by src/app.py in every worker: one connection per thread. Greenlets
+# are not bounded that way, so gevent gets a fixed pool they queue on.
+if worker_class == "gevent":
+    os.environ.setdefault("DB_POOL_SIZE", "20")
+else:
+    os.environ.setdefault("DB_POOL_SIZE", str(threads))
+
+# Read by api/broker.py: streams per worker, the rest of the threads stay for the API
+os.environ.setdefault("SSE_MAX_STREAMS", str(max(1, threads // 2)))
+
+
+def when_ready(server):
+    if workers > 1 and not os.getenv("BROKER_URL"):
+        server.log.warning("%s workers without BROKER_URL: live plan events only reach streams in "
+                           "the worker that handled the change; set a Redis BROKER_URL", workers)
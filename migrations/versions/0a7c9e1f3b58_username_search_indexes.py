@@ -0,0 +1,33 @@
+"""username search indexes
+
+Revision ID: 0a7c9e1f3b58
+Revises: f2a6b8c0d1e4
+Create Date: 2026-10-18 14:20:16.874302
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = '0a7c9e1f3b58'
+down_revision = 'f2a6b8c0d1e4'
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    # Only Postgres searches usernames in SQL; SQLite uses the in-process
+    # index in api/usersearch.py, so there is nothing to create there.
+    if op.get_bind().dialect.name != 'postgresql':
+        return
+    op.execute('CREATE EXTENSION IF NOT EXISTS pg_trgm')
+    op.execute('CREATE INDEX ix_user_username_lower ON "user" (lower(username) text_pattern_ops)')
+    op.execute('CREATE INDEX ix_user_username_trgm ON "user" USING gin (lower(username) gin_trgm_ops)')
+
+
+def downgrade():
+    if op.get_bind().dialect.name != 'postgresql':
+        return
+    op.execute('DROP INDEX IF EXISTS ix_user_username_trgm')
+    op.execute('DROP INDEX IF EXISTS ix_user_username_lower')
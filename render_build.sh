@@ -7,4 +7,5 @@ npm run build
 
 pipenv install
 
+pipenv run compress-assets
 pipenv run upgrade
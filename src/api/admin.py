@@ -7,9 +7,9 @@ from flask_admin.contrib.sqla import ModelView
 from flask_admin.theme import Bootstrap4Theme
 
 
-def setup_admin(app):
+def setup_admin(app, url='/admin'):
     app.secret_key = os.environ.get('FLASK_APP_KEY', 'sample key')
-    admin = Admin(app, name='4Geeks Admin', theme=Bootstrap4Theme(swatch='cerulean'))
+    admin = Admin(app, name='4Geeks Admin', url=url, theme=Bootstrap4Theme(swatch='cerulean'))
 
     # Dynamically add all models to the admin interface
     for name, obj in inspect.getmembers(models):
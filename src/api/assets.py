@@ -0,0 +1,137 @@
+"""
+Static serving for the built SPA in dist/.
+
+dist/ is scanned once at startup into an in-memory manifest, so serving a
+path is a dict lookup, with no stat() per request. Any unknown path gets
+index.html (client-side routing). Vite's content-hashed files
+(assets/name-<hash>.js) never change under the same name, so they are
+cached for a year as immutable. Everything else, index.html included, is
+revalidated on every use (no-cache plus ETag).
+
+flask compress-assets writes .gz files (and .br ones if the optional brotli
+package is installed) next to each compressible file. Requests get the
+smallest of these that their Accept-Encoding allows. A variant older than
+its source is ignored. Files up to INLINE_MAX bytes are kept in memory; larger
+ones are sent from disk.
+"""
+import gzip
+import mimetypes
+import os
+import re
+from flask import Response, abort, request, send_file
+
+try:
+    import brotli
+except ImportError:  # optional: only gzip variants without it
+    brotli = None
+
+HASHED       = re.compile(r"(^|/)assets/.+-[\w-]{8,}\.\w+$")
+COMPRESSIBLE = {".js", ".mjs", ".css", ".html", ".svg", ".json", ".map", ".txt", ".xml", ".ico", ".wasm"}
+ENCODINGS    = (("br", ".br"), ("gzip", ".gz"))  # preferred first
+INLINE_MAX   = 512 * 1024
+MIN_COMPRESS = 1024
+ONE_YEAR     = 365 * 24 * 3600
+
+
+class Variant:
+    __slots__ = ("encoding", "path", "size", "etag", "data")
+
+    def __init__(self, encoding, path, stat):
+        self.encoding = encoding
+        self.path     = path
+        self.size     = stat.st_size
+        self.etag     = f"{int(stat.st_mtime_ns):x}-{stat.st_size:x}{'-' + encoding if encoding else ''}"
+        self.data     = None
+        if stat.st_size <= INLINE_MAX:
+            with open(path, "rb") as f:
+                self.data = f.read()
+
+
+class Asset:
+    __slots__ = ("mimetype", "immutable", "mtime", "variants")
+
+    def __init__(self, name, path, stat):
+        self.mimetype  = mimetypes.guess_type(name)[0] or "application/octet-stream"
+        self.immutable = bool(HASHED.search(name))
+        self.mtime     = stat.st_mtime
+        self.variants  = {None: Variant(None, path, stat)}
+
+    def pick(self, accept_encodings):
+        best = self.variants[None]
+        for encoding, _ in ENCODINGS:
+            variant = self.variants.get(encoding)
+            if variant is not None and variant.size < best.size and accept_encodings[encoding]:
+                best = variant
+        return best
+
+
+class AssetManifest:
+
+    def __init__(self, root):
+        self.root  = os.path.realpath(root)
+        self.files = {}
+        self.load()
+
+    def load(self):
+        files = {}
+        for dirpath, _, filenames in os.walk(self.root):
+            for filename in filenames:
+                path = os.path.join(dirpath, filename)
+                name = os.path.relpath(path, self.root).replace(os.sep, "/")
+                if any(name.endswith(ext) for _, ext in ENCODINGS):
+                    continue
+                stat  = os.stat(path)
+                asset = files[name] = Asset(name, path, stat)
+                for encoding, ext in ENCODINGS:
+                    if filename + ext in filenames:
+                        variant_stat = os.stat(path + ext)
+                        if variant_stat.st_mtime >= stat.st_mtime:  # a stale .gz would serve an old build
+                            asset.variants[encoding] = Variant(encoding, path + ext, variant_stat)
+        self.files = files
+
+    def serve(self, name):
+        asset = self.files.get(name) or self.files.get("index.html")
+        if asset is None:
+            abort(404)
+        variant = asset.pick(request.accept_encodings)
+        if variant.data is not None:
+            response = Response(variant.data, mimetype=asset.mimetype)
+        else:
+            response = send_file(variant.path, mimetype=asset.mimetype, conditional=False, etag=False)
+            response.cache_control.no_cache = None
+        response.set_etag(variant.etag)
+        response.last_modified = asset.mtime
+        if variant.encoding:
+            response.headers["Content-Encoding"] = variant.encoding
+        if len(asset.variants) > 1:
+            response.vary.add("Accept-Encoding")
+        if asset.immutable:
+            response.cache_control.public    = True
+            response.cache_control.max_age   = ONE_YEAR
+            response.cache_control.immutable = True
+        else:
+            response.cache_control.no_cache = True
+        return response.make_conditional(request)
+
+
+def compress_assets(root):
+    """Write .gz (and .br) variants of the compressible files under root. Returns {encoding: files}."""
+    written = {"gzip": 0, "br": 0}
+    for dirpath, _, filenames in os.walk(root):
+        for filename in filenames:
+            if os.path.splitext(filename)[1] not in COMPRESSIBLE:
+                continue
+            path = os.path.join(dirpath, filename)
+            with open(path, "rb") as f:
+                data = f.read()
+            if len(data) < MIN_COMPRESS:
+                continue
+            outputs = [("gzip", ".gz", gzip.compress(data, 9, mtime=0))]
+            if brotli is not None:
+                outputs.append(("br", ".br", brotli.compress(data, quality=11)))
+            for encoding, ext, compressed in outputs:
+                if len(compressed) < len(data):
+                    with open(path + ext, "wb") as f:
+                        f.write(compressed)
+                    written[encoding] += 1
+    return written
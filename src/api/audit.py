@@ -0,0 +1,79 @@
+import re
+from datetime import datetime
+from sqlalchemy import select, update
+
+from api.models import (db, User, Group, Plan, PlanOption, Vote, Expense, ExpenseSplit, PlanMemory, GroupStat,
+                        GroupBalance)
+from api.pagination import keyset
+from api.queries import (LOAD_PROFILES, plan_query, user_group_ids, group_query, group_members_stmt,
+                         plan_balances_stmt)
+from api.ledger import balance_users_stmt, payment_stmt
+from api.usersearch import sql_search_query
+from api.groupstats import hall_of_fame_query
+
+SQLITE_SCAN = re.compile(r"^SCAN (?!CONSTANT ROW|anon_|\(subquery)(\S+)(?!.* USING )")
+
+
+def route_queries(user_id=1, group_id=1, plan_id=1):
+    """The statements behind each route, with representative parameters."""
+    after = (datetime(2026, 1, 1), 1)
+    return [
+        ("POST /auth/login",            User.query.filter_by(email="a@b.c")),
+        ("POST /auth/register",         User.query.filter_by(username="a")),
+        ("GET /auth/me",                User.query.filter_by(id=user_id)),
+        ("GET /users/search",           sql_search_query("abc", 10) if db.engine.dialect.name == "postgresql"
+                                        else User.query.filter(User.id.in_([user_id]))),
+        ("GET /groups",                 group_query(user_group_ids(user_id))),
+        ("GET /groups (members)",       group_members_stmt([group_id], 5)),
+        ("GET /plans",                  plan_query("plan_list").filter(Plan.group_id.in_(user_group_ids(user_id)))
+                                        .order_by(Plan.created_at.desc())),
+        ("GET /plans?cursor",           keyset(plan_query("plan_list").filter(Plan.group_id.in_(user_group_ids(user_id))),
+                                               Plan, after).limit(51)),
+        ("GET /groups/<id>/plans",      keyset(plan_query("plan_list").filter_by(group_id=group_id), Plan, after).limit(51)),
+        ("GET /groups/<id>/hall-of-fame", hall_of_fame_query(group_id)),
+        ("GET /groups/<id>/stats",      GroupStat.query.filter_by(group_id=group_id)),
+        ("GET /groups/<id>/ledger",     GroupBalance.query.options(*LOAD_PROFILES["group_ledger"])
+                                        .filter_by(group_id=group_id)),
+        ("GET /plans/<id>/options",     PlanOption.query.filter_by(plan_id=plan_id)),
+        ("PlanOption.votes",            Vote.query.filter_by(option_id=plan_id)),
+        ("POST /plans/<id>/vote",       Vote.query.filter_by(plan_id=plan_id, user_id=user_id, option_id=None)),
+        ("POST /plans/<id>/vote (veto)", Vote.query.filter_by(plan_id=plan_id, user_id=user_id, is_veto=True)),
+        ("GET /plans/<id>/votes",       keyset(Vote.query.filter_by(plan_id=plan_id), Vote, after, False).limit(51)),
+        ("GET /plans/<id>/expenses",    keyset(Expense.query.filter_by(plan_id=plan_id), Expense, after, False).limit(51)),
+        ("Expense.splits",              ExpenseSplit.query.filter_by(expense_id=plan_id)),
+        ("GET /plans/<id>/expenses/summary", plan_balances_stmt(plan_id)),
+        ("POST /plans/<id>/expenses (ledger lock)",     select(Group.id).where(Group.id == group_id).with_for_update()),
+        ("POST /plans/<id>/expenses (ledger balances)", balance_users_stmt(group_id, [user_id])),
+        ("POST /plans/<id>/expenses (ledger update)",   update(GroupBalance)
+                                                        .where(GroupBalance.group_id == group_id,
+                                                               GroupBalance.user_id == user_id)
+                                                        .values(balance=GroupBalance.balance + 1)),
+        ("POST /expenses/<id>/splits/<id>/pay", payment_stmt(plan_id)),
+        ("GET /plans/<id>/memories",    keyset(PlanMemory.query.filter_by(plan_id=plan_id), PlanMemory, after, False).limit(51)),
+        ("GET /plans/<id>/dashboard (plan)",     plan_query("plan_detail").filter(Plan.id == plan_id)),
+        ("GET /plans/<id>/dashboard (votes)",    Vote.query.filter_by(plan_id=plan_id)),
+        ("GET /plans/<id>/dashboard (expenses)", Expense.query.options(*LOAD_PROFILES["expense_list"])
+                                                 .filter_by(plan_id=plan_id)),
+        ("GET /plans/<id>/dashboard (memories)", PlanMemory.query.options(*LOAD_PROFILES["memory_list"])
+                                                 .filter_by(plan_id=plan_id)),
+    ]
+
+
+def explain(stmt):
+    """Return (plan lines, full-scan lines) for stmt on the current database."""
+    stmt    = getattr(stmt, "statement", stmt)
+    dialect = db.engine.dialect
+    sql     = str(stmt.compile(dialect=dialect, compile_kwargs={"literal_binds": True}))
+    conn    = db.session.connection()
+    if dialect.name == "sqlite":
+        plan  = [row[-1] for row in conn.exec_driver_sql("EXPLAIN QUERY PLAN " + sql)]
+        scans = [line for line in plan if SQLITE_SCAN.match(line)]
+    elif dialect.name == "postgresql":
+        # Small tables are cheaper to seq-scan; turn that off so a Seq Scan
+        # in the plan means there is no usable index at all.
+        conn.exec_driver_sql("SET LOCAL enable_seqscan = off")
+        plan  = [row[0] for row in conn.exec_driver_sql("EXPLAIN " + sql)]
+        scans = [line.strip() for line in plan if "Seq Scan" in line]
+    else:
+        raise RuntimeError(f"EXPLAIN no soportado para {dialect.name}")
+    return plan, scans
@@ -0,0 +1,76 @@
+"""
+current_user() for JWT-protected routes.
+
+The user is memoized on flask.g for the request. Behind that sits a small
+per-process TTL + LRU cache of the user's column values, so a cache hit
+rebuilds the User without a SELECT. Any flush, commit or bulk UPDATE that
+touches a User evicts it. Other processes see the change once their copy
+expires (USER_CACHE_TTL).
+"""
+import os
+from flask import g
+from flask_jwt_extended import get_jwt_identity
+from sqlalchemy import event, inspect
+from sqlalchemy.orm import Session, make_transient_to_detached
+
+from api.cache import TTLCache
+from api.models import db, User
+
+USER_CACHE_TTL  = float(os.getenv("USER_CACHE_TTL", 60))
+USER_CACHE_SIZE = int(os.getenv("USER_CACHE_SIZE", 2048))
+
+user_cache = TTLCache(USER_CACHE_SIZE, USER_CACHE_TTL)
+COLUMNS    = [attr.key for attr in inspect(User).column_attrs]
+
+
+def setup_auth(app):
+
+    @app.before_request
+    def forget_current_user():
+        # g outlives the request when an app context was already pushed (tests, CLI)
+        g.pop("current_user", None)
+
+
+def current_user():
+    if "current_user" not in g:
+        g.current_user = load_user(int(get_jwt_identity()))
+    return g.current_user
+
+
+def load_user(user_id):
+    columns, state = user_cache.get(user_id)
+    if state is not None:
+        user = User(**columns)
+        make_transient_to_detached(user)
+        # load=False attaches the cached copy to the session without a SELECT
+        return db.session.merge(user, load=False)
+    user = db.session.get(User, user_id)
+    if user is not None:
+        user_cache.set(user_id, {key: getattr(user, key) for key in COLUMNS})
+    return user
+
+
+@event.listens_for(Session, "after_flush")
+def _collect_changed_users(session, flush_context):
+    changed = {obj.id for obj in session.dirty | session.deleted if isinstance(obj, User)}
+    for user_id in changed:
+        user_cache.delete(user_id)
+    session.info.setdefault("changed_users", set()).update(changed)
+
+
+@event.listens_for(Session, "after_commit")
+def _evict_committed_users(session):
+    # Evict again: another request may have re-cached the old row between flush and commit
+    for user_id in session.info.pop("changed_users", ()):
+        user_cache.delete(user_id)
+
+
+@event.listens_for(Session, "after_rollback")
+def _forget_changed_users(session):
+    session.info.pop("changed_users", None)
+
+
+@event.listens_for(Session, "do_orm_execute")
+def _evict_on_bulk_write(state):
+    if (state.is_update or state.is_delete) and state.bind_mapper is inspect(User):
+        user_cache.clear()
@@ -0,0 +1,177 @@
+"""
+Pub/sub for live plan updates, streamed as Server-Sent Events.
+
+Routes publish() to a channel after their commit, and GET /plans/<id>/events
+streams whatever arrives on that plan's channel. The default LocalBackend
+fans out inside this process only, which covers a single worker and tests.
+To fan out across several gunicorn workers or hosts, set BROKER_URL to a
+Redis URL (this needs the optional redis package).
+
+Each open stream holds a worker thread (gthread) for up to SSE_MAX_SECONDS.
+EventSource then reconnects on its own and gets a fresh snapshot. With
+SSE_MAX_STREAMS set (gunicorn.conf.py sets it to half the threads) a worker
+holds at most that many streams, so the API keeps the rest of its threads.
+A stream over the limit ends right away and tells the browser to retry in
+SSE_BUSY_RETRY_MS.
+"""
+import json
+import logging
+import os
+import queue
+import threading
+import time
+
+try:
+    import redis
+except ImportError:  # optional: only needed with BROKER_URL
+    redis = None
+
+BROKER_URL       = os.getenv("BROKER_URL", "")
+SSE_HEARTBEAT    = float(os.getenv("SSE_HEARTBEAT", 15))
+SSE_MAX_SECONDS  = float(os.getenv("SSE_MAX_SECONDS", 300))
+SSE_MAX_STREAMS  = int(os.getenv("SSE_MAX_STREAMS", 0))  # per process, 0 = no limit
+SSE_RETRY_MS     = 3000
+SSE_BUSY_RETRY_MS = 30000
+SUBSCRIBER_QUEUE = 100
+
+log = logging.getLogger(__name__)
+
+
+def plan_channel(plan_id):
+    return f"plan:{plan_id}"
+
+
+def format_event(event, data):
+    return f"event: {event}\ndata: {json.dumps(data, separators=(',', ':'))}\n\n"
+
+
+class LocalBackend:
+
+    def __init__(self, maxsize=SUBSCRIBER_QUEUE):
+        self.maxsize   = maxsize
+        self._lock     = threading.Lock()
+        self._channels = {}
+
+    def publish(self, channel, message):
+        with self._lock:
+            subscribers = list(self._channels.get(channel, ()))
+        for sub in subscribers:
+            try:
+                sub.queue.put_nowait(message)
+            except queue.Full:
+                sub.overflowed = True  # too slow to keep up: end its stream, it reconnects
+
+    def subscribe(self, channel):
+        sub = LocalSubscription(self, channel)
+        with self._lock:
+            self._channels.setdefault(channel, set()).add(sub)
+        return sub
+
+    def has_subscribers(self, channel):
+        return bool(self._channels.get(channel))
+
+    def unsubscribe(self, sub):
+        with self._lock:
+            subs = self._channels.get(sub.channel)
+            if subs is not None:
+                subs.discard(sub)
+                if not subs:
+                    del self._channels[sub.channel]
+
+
+class LocalSubscription:
+
+    def __init__(self, backend, channel):
+        self.backend    = backend
+        self.channel    = channel
+        self.queue      = queue.Queue(backend.maxsize)
+        self.overflowed = False
+
+    def get(self, timeout):
+        try:
+            return self.queue.get(timeout=timeout)
+        except queue.Empty:
+            return None
+
+    def close(self):
+        self.backend.unsubscribe(self)
+
+
+class RedisBackend:
+
+    def __init__(self, url):
+        if redis is None:
+            raise RuntimeError("BROKER_URL requires the redis package (pip install redis)")
+        self.client = redis.Redis.from_url(url)
+
+    def publish(self, channel, message):
+        self.client.publish(channel, message)
+
+    def has_subscribers(self, channel):
+        return any(count for _, count in self.client.pubsub_numsub(channel))
+
+    def subscribe(self, channel):
+        return RedisSubscription(self.client, channel)
+
+
+class RedisSubscription:
+    overflowed = False  # Redis drops slow subscribers itself (client-output-buffer-limit)
+
+    def __init__(self, client, channel):
+        self.pubsub = client.pubsub(ignore_subscribe_messages=True)
+        self.pubsub.subscribe(channel)
+
+    def get(self, timeout):
+        message = self.pubsub.get_message(timeout=timeout)
+        return message["data"].decode() if message else None
+
+    def close(self):
+        self.pubsub.close()
+
+
+backend      = RedisBackend(BROKER_URL) if BROKER_URL else LocalBackend()
+stream_slots = threading.BoundedSemaphore(SSE_MAX_STREAMS) if SSE_MAX_STREAMS else None
+
+
+def publish(channel, event, data):
+    """data may be a callable: it is only evaluated when the channel has subscribers."""
+    # Called after the commit: a broker hiccup must not turn a saved vote into a 500
+    try:
+        if callable(data):
+            if not backend.has_subscribers(channel):
+                return
+            data = data()
+        backend.publish(channel, format_event(event, data))
+    except Exception:
+        log.warning("broker publish to %s failed", channel, exc_info=True)
+
+
+def subscribe(channel):
+    return backend.subscribe(channel)
+
+
+def event_stream(subscription, initial=()):
+    """SSE text for subscription: the initial events, then live ones and heartbeats."""
+    if stream_slots is not None and not stream_slots.acquire(blocking=False):
+        subscription.close()
+        yield f"retry: {SSE_BUSY_RETRY_MS}\n\n"
+        return
+    try:
+        yield f"retry: {SSE_RETRY_MS}\n\n"
+        for event, data in initial:
+            yield format_event(event, data)
+        now = last = time.monotonic()
+        deadline   = now + SSE_MAX_SECONDS
+        while now < deadline and not subscription.overflowed:
+            message = subscription.get(timeout=1.0)
+            now     = time.monotonic()
+            if message is not None:
+                yield message
+                last = now
+            elif now - last >= SSE_HEARTBEAT:
+                yield ": ping\n\n"
+                last = now
+    finally:
+        subscription.close()
+        if stream_slots is not None:
+            stream_slots.release()
@@ -0,0 +1,49 @@
+import threading
+import time
+from collections import OrderedDict
+
+
+class TTLCache:
+    """Thread-safe LRU cache whose entries go fresh -> stale -> expired.
+
+    With stale_ttl=0 it is a plain TTL + LRU cache.
+    """
+
+    def __init__(self, maxsize, ttl, stale_ttl=0):
+        self.maxsize   = maxsize
+        self.ttl       = ttl
+        self.stale_ttl = stale_ttl
+        self._data     = OrderedDict()
+        self._lock     = threading.Lock()
+
+    def get(self, key):
+        """Return (value, "fresh" | "stale") or (None, None) on a miss."""
+        with self._lock:
+            entry = self._data.get(key)
+            if entry is None:
+                return None, None
+            value, stored_at = entry
+            age = time.monotonic() - stored_at
+            if age > self.ttl + self.stale_ttl:
+                del self._data[key]
+                return None, None
+            self._data.move_to_end(key)
+            return value, "fresh" if age <= self.ttl else "stale"
+
+    def set(self, key, value):
+        with self._lock:
+            self._data[key] = (value, time.monotonic())
+            self._data.move_to_end(key)
+            while len(self._data) > self.maxsize:
+                self._data.popitem(last=False)
+
+    def delete(self, key):
+        with self._lock:
+            self._data.pop(key, None)
+
+    def clear(self):
+        with self._lock:
+            self._data.clear()
+
+    def __len__(self):
+        return len(self._data)
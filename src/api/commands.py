@@ -1,5 +1,15 @@
+import os
+import sys
+import time
 import click
 from api.models import db, User, Group, Plan, PlanStatus
+from api.audit import route_queries, explain
+from api.tallies import rebuild_tallies
+from api.ledger import rebuild_ledger
+from api.groupstats import rebuild_group_stats
+from api.fake_ticketmaster import make_fake_server
+from api.seed import seed, SEED_PASSWORD
+from api.assets import compress_assets, brotli
 from werkzeug.security import generate_password_hash
 from datetime import datetime
 
@@ -41,6 +51,7 @@ def setup_commands(app):
 
         db.session.add_all([p1, p2, p3])
         db.session.commit()
+        rebuild_group_stats()
 
         print("✅ Datos de demo creados:")
         print("   marta@test.com / 1234")
@@ -53,13 +64,93 @@ def setup_commands(app):
     @click.argument("count")
     def insert_test_users(count):
         print("Creating test users")
-        for x in range(1, int(count) + 1):
-            user = User()
-            user.email    = "test_user" + str(x) + "@test.com"
-            user.username = "user" + str(x)
-            user.password = generate_password_hash("123456")
-            user.is_active = True
-            db.session.add(user)
-            db.session.commit()
+        password = generate_password_hash("123456")  # same password for all: hash it once
+        users    = [User(email=f"test_user{x}@test.com", username=f"user{x}", password=password, is_active=True)
+                    for x in range(1, int(count) + 1)]
+        db.session.add_all(users)
+        db.session.commit()
+        for user in users:
             print("User: ", user.email, " created.")
         print("All test users created")
+
+    @app.cli.command("seed")
+    @click.option("--scale", default=1, help="Tamaño del dataset: ~200 usuarios y ~40 grupos por unidad.")
+    @click.option("--seed", "seed_value", default=0, help="Semilla: misma semilla y escala, mismos datos.")
+    @click.option("--reset", is_flag=True, help="Borra y recrea todas las tablas antes de sembrar.")
+    def seed_command(scale, seed_value, reset):
+        """Genera un dataset sintético realista para pruebas de carga."""
+        if reset:
+            db.drop_all()
+            db.create_all()
+        elif db.session.query(User.id).first() is not None:
+            print("❌ La base de datos ya tiene usuarios; usa --reset para empezar de cero")
+            sys.exit(1)
+        started = time.perf_counter()
+        counts  = seed(scale, seed_value)
+        for table, rows in counts.items():
+            print(f"   {table:<15} {rows:>9}")
+        print(f"✅ Dataset sembrado en {time.perf_counter() - started:.1f}s "
+              f"(contraseña de todos los usuarios: {SEED_PASSWORD})")
+
+    @app.cli.command("audit-queries")
+    def audit_queries():
+        """Ejecuta EXPLAIN sobre las consultas de cada ruta y marca las que recorren tablas enteras."""
+        flagged = 0
+        for route, stmt in route_queries():
+            plan, scans = explain(stmt)
+            if scans:
+                flagged += 1
+                print(f"❌ {route}")
+                for line in scans:
+                    print(f"      {line}")
+            else:
+                print(f"✅ {route}")
+        db.session.rollback()
+        if flagged:
+            print(f"{flagged} consultas hacen full scan")
+            sys.exit(1)
+        print("Ninguna consulta hace full scan")
+
+    @app.cli.command("rebuild-tallies")
+    def rebuild_tallies_command():
+        """Recalcula los contadores de votos de planes y opciones desde cero."""
+        plans, options = rebuild_tallies()
+        print(f"✅ Contadores recalculados: {plans} planes y {options} opciones con votos")
+
+    @app.cli.command("rebuild-ledger")
+    @click.option("--check", is_flag=True, help="Solo verifica, no reescribe los saldos.")
+    def rebuild_ledger_command(check):
+        """Verifica los saldos de grupo contra Expense/ExpenseSplit y los reconstruye."""
+        drift = rebuild_ledger(fix=not check)
+        for group_id, user_id in drift:
+            print(f"   grupo {group_id}, usuario {user_id}: saldo desincronizado")
+        if check and drift:
+            sys.exit(1)
+        print(f"✅ Ledger {'verificado' if check else 'reconstruido'} ({len(drift)} saldos desincronizados)")
+
+    @app.cli.command("rebuild-group-stats")
+    def rebuild_group_stats_command():
+        """Recalcula las estadísticas y el Hall of Fame de cada grupo desde sus planes."""
+        groups = rebuild_group_stats()
+        print(f"✅ Estadísticas recalculadas para {groups} grupos")
+
+    @app.cli.command("fake-ticketmaster")
+    @click.option("--port", default=8089, help="Puerto en el que escuchar.")
+    @click.option("--delay", default=0.0, help="Latencia artificial por petición, en segundos.")
+    def fake_ticketmaster(port, delay):
+        """Arranca un proveedor de eventos falso para trabajar sin conexión."""
+        server, url = make_fake_server(port, delay)
+        print(f"✅ Ticketmaster falso en {url}")
+        print(f"   export TICKETMASTER_URL={url}")
+        try:
+            server.serve_forever()
+        except KeyboardInterrupt:
+            server.server_close()
+
+    @app.cli.command("compress-assets")
+    def compress_assets_command():
+        """Precomprime dist/ (.gz y, con brotli instalado, .br) para servirlo comprimido."""
+        written = compress_assets(os.path.join(app.root_path, "..", "dist"))
+        print(f"✅ {written['gzip']} ficheros .gz y {written['br']} .br en dist/")
+        if brotli is None:
+            print("   (instala brotli para generar también .br)")
@@ -0,0 +1,69 @@
+"""
+Strong ETags for plan and group resources.
+
+Plan.version and Group.version are bumped by every route that changes the
+row or anything embedded in its GET responses (options, votes, expenses,
+memories, members), and by the rebuild commands for the rows they fix. @conditional(...) reads just the version column. When
+it matches If-None-Match the response is a 304, without calling the view.
+"""
+import hashlib
+from functools import wraps
+from flask import request, make_response
+from sqlalchemy import select, update
+
+from api.models import db, Plan, Group
+
+RESOURCES = {"plan": (Plan, "plan_id"), "group": (Group, "group_id")}
+
+
+def bump_plan(plan_id):
+    _bump(Plan, plan_id)
+
+
+def bump_group(group_id):
+    _bump(Group, group_id)
+
+
+def bump_plans(plan_ids):
+    _bump(Plan, *plan_ids)
+
+
+def bump_groups(group_ids):
+    _bump(Group, *group_ids)
+
+
+def _bump(model, *row_ids):
+    if row_ids:
+        db.session.execute(update(model).where(model.id.in_(row_ids))
+                           .values(version=model.version + 1)
+                           .execution_options(synchronize_session=False))
+
+
+def make_etag(kind, row_id, version):
+    # The query string is part of the tag: ?limit/?cursor change the body
+    raw = f"{kind}:{row_id}:{version}:{request.endpoint}:{request.query_string.decode()}"
+    return hashlib.sha1(raw.encode()).hexdigest()[:24]
+
+
+def conditional(kind):
+    model, arg = RESOURCES[kind]
+
+    def decorator(view):
+        @wraps(view)
+        def wrapper(*args, **kwargs):
+            version = db.session.scalar(select(model.version).where(model.id == kwargs[arg]))
+            if version is None:
+                return view(*args, **kwargs)
+            etag = make_etag(kind, kwargs[arg], version)
+            if request.if_none_match.contains(etag):
+                response = make_response("", 304)
+            else:
+                response = make_response(view(*args, **kwargs))
+                if response.status_code != 200:
+                    return response
+            response.set_etag(etag)
+            response.cache_control.private  = True
+            response.cache_control.no_cache = True
+            return response
+        return wrapper
+    return decorator
@@ -0,0 +1,156 @@
+import csv
+import io
+import json
+from sqlalchemy import select, insert
+
+from api.models import db, Expense, ExpenseSplit, SplitType, group_members
+from api.ledger import split_deltas, apply_deltas
+from api.etags import bump_plan
+
+MAX_BULK_ROWS = 5000
+
+
+def compute_splits(split_type, total, participants, payer_id):
+    """[(user_id, amount, is_paid)] for an expense, following its SplitType."""
+    n      = len(participants)
+    splits = []
+    for p in participants:
+        uid = p["user_id"]
+        if split_type == SplitType.IGUAL:
+            amount = round(total / n, 2)
+        elif split_type == SplitType.POR_PORCENTAJE:
+            amount = round(total * float(p.get("percentage", 100 / n)) / 100, 2)
+        elif split_type == SplitType.UNO_PAGA:
+            amount = 0 if uid == payer_id else (round(total / (n - 1), 2) if n > 1 else 0)
+        else:
+            amount = float(p.get("amount", total / n))
+        splits.append((uid, amount, uid == payer_id))
+    return splits
+
+
+# ── Import parsing ────────────────────────────────────────────────────────────
+
+def iter_rows(req):
+    """Yield raw expense dicts (or a ValueError) from a JSON, NDJSON or CSV request.
+
+    NDJSON and CSV bodies, raw or as a multipart `file`, are read line by line
+    from the request stream instead of being buffered whole.
+    """
+    upload = req.files.get("file")
+    stream = upload.stream if upload else req.stream
+    kind   = (upload.mimetype if upload else req.mimetype) or ""
+    name   = (upload.filename or "") if upload else ""
+    if kind == "text/csv" or name.endswith(".csv"):
+        for raw in csv.DictReader(io.TextIOWrapper(stream, encoding="utf-8-sig")):
+            yield raw
+    elif kind in ("application/x-ndjson", "application/jsonl") or name.endswith((".ndjson", ".jsonl")):
+        for line in io.TextIOWrapper(stream, encoding="utf-8"):
+            if line.strip():
+                try:
+                    yield json.loads(line)
+                except ValueError:
+                    yield ValueError("JSON inválido")
+    else:
+        body = req.get_json(silent=True)
+        if isinstance(body, dict):
+            body = body.get("expenses")
+        if not isinstance(body, list):
+            raise ValueError("Se esperaba una lista de gastos, CSV o NDJSON")
+        yield from body
+
+
+def read_rows(req):
+    try:
+        yield from iter_rows(req)
+    except (UnicodeDecodeError, csv.Error) as ex:
+        yield ValueError(f"Archivo ilegible: {ex}")
+
+
+def parse_participants(text, split_type):
+    # CSV form: "1;2;3" or "1:30;2:70" (percentage or amount depending on split_type)
+    key = "percentage" if split_type == SplitType.POR_PORCENTAJE else "amount"
+    participants = []
+    for item in filter(None, (part.strip() for part in text.split(";"))):
+        uid, _, value = item.partition(":")
+        participants.append({"user_id": int(uid), **({key: float(value)} if value else {})})
+    return participants
+
+
+def normalize_row(raw, member_ids, default_payer):
+    if not isinstance(raw, dict):
+        raise ValueError("Cada gasto debe ser un objeto")
+    description = str(raw.get("description") or "").strip()
+    if not description:
+        raise ValueError("description es obligatorio")
+    try:
+        total = float(raw.get("total_amount"))
+    except (TypeError, ValueError):
+        raise ValueError("total_amount debe ser un número")
+    if total <= 0:
+        raise ValueError("total_amount debe ser positivo")
+    try:
+        split_type = SplitType(raw.get("split_type") or "igual")
+    except ValueError:
+        raise ValueError(f"split_type inválido: {raw.get('split_type')}")
+    try:
+        payer_id     = int(raw.get("paid_by_id") or default_payer)
+        participants = raw.get("participants") or [{"user_id": uid} for uid in member_ids]
+        if isinstance(participants, str):
+            participants = parse_participants(participants, split_type)
+        participants = [{**p, "user_id": int(p["user_id"])} for p in participants]
+    except (TypeError, ValueError, KeyError):
+        raise ValueError("participants inválido")
+    if not participants:
+        raise ValueError("participants no puede estar vacío")
+    if payer_id not in member_ids:
+        raise ValueError(f"paid_by_id {payer_id} no es miembro del grupo")
+    outsiders = [p["user_id"] for p in participants if p["user_id"] not in member_ids]
+    if outsiders:
+        raise ValueError(f"Participantes que no son miembros del grupo: {outsiders}")
+    try:
+        splits = compute_splits(split_type, total, participants, payer_id)
+    except (TypeError, ValueError):
+        raise ValueError("percentage o amount inválido en participants")
+    return {"description": description, "total_amount": total, "split_type": split_type,
+            "paid_by_id": payer_id, "splits": splits}
+
+
+# ── Bulk write ────────────────────────────────────────────────────────────────
+
+def import_expenses(plan, rows, default_payer):
+    """Validate every row, then bulk-insert the valid ones in a single transaction.
+
+    Returns (created expense ids, [{"row": i, "message": ...}]).
+    """
+    member_ids = set(db.session.scalars(
+        select(group_members.c.user_id).where(group_members.c.group_id == plan.group_id)))
+    valid, errors = [], []
+    for i, raw in enumerate(rows):
+        if i >= MAX_BULK_ROWS:
+            errors.append({"row": i, "message": f"Máximo {MAX_BULK_ROWS} gastos por importación"})
+            break
+        try:
+            if isinstance(raw, Exception):
+                raise raw
+            valid.append(normalize_row(raw, member_ids, default_payer))
+        except ValueError as ex:
+            errors.append({"row": i, "message": str(ex)})
+    if not valid:
+        return [], errors
+
+    ids = db.session.scalars(
+        insert(Expense).returning(Expense.id, sort_by_parameter_order=True),
+        [{"plan_id": plan.id, "description": r["description"], "total_amount": r["total_amount"],
+          "paid_by_id": r["paid_by_id"], "split_type": r["split_type"]} for r in valid]).all()
+    db.session.execute(insert(ExpenseSplit), [
+        {"expense_id": expense_id, "user_id": uid, "amount": amount, "is_paid": is_paid}
+        for expense_id, r in zip(ids, valid) for uid, amount, is_paid in r["splits"]])
+
+    deltas = {}
+    for r in valid:
+        for uid, delta in split_deltas(r["paid_by_id"], r["splits"]).items():
+            deltas[uid] = deltas.get(uid, 0) + delta
+    apply_deltas(plan.group_id, deltas)
+    bump_plan(plan.id)
+    db.session.commit()
+    return ids, errors
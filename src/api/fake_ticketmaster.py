@@ -0,0 +1,67 @@
+"""
+Local stand-in for the Ticketmaster Discovery API, for offline development
+and tests:
+
+    $ flask fake-ticketmaster --port 8089 --delay 0.5
+    $ TICKETMASTER_URL=http://127.0.0.1:8089/discovery/v2/events.json flask run
+"""
+import json
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from urllib.parse import urlparse, parse_qs
+
+
+def fake_events(city, keyword):
+    names = ["Festival de Verano", "Noche de Stand-Up Comedy", "Torneo de Dardos Regional"]
+    return {"_embedded": {"events": [{
+        "id": f"FAKE{i:03d}",
+        "name": f"{name} {keyword}".strip(),
+        "url": "#",
+        "dates": {"start": {"localDate": "2026-07-15", "localTime": "20:00"}},
+        "_embedded": {"venues": [{"name": "Sala Fake", "city": {"name": city}}]},
+        "classifications": [{"segment": {"name": "Music"}}],
+        "images": [{"url": ""}],
+        "priceRanges": [{"min": 10 * (i + 1), "max": 30 * (i + 1)}],
+    } for i, name in enumerate(names)]}}
+
+
+class FakeTicketmasterHandler(BaseHTTPRequestHandler):
+    delay    = 0.0
+    requests = 0
+
+    def do_GET(self):
+        type(self).requests += 1
+        params = {k: v[0] for k, v in parse_qs(urlparse(self.path).query).items()}
+        if not params.get("apikey"):
+            return self._reply(401, {"fault": {"faultstring": "Invalid ApiKey"}})
+        time.sleep(self.delay)
+        self._reply(200, fake_events(params.get("city", ""), params.get("keyword", "")))
+
+    def _reply(self, status, payload):
+        body = json.dumps(payload).encode()
+        self.send_response(status)
+        self.send_header("Content-Type", "application/json")
+        self.send_header("Content-Length", str(len(body)))
+        self.end_headers()
+        try:
+            self.wfile.write(body)
+        except (BrokenPipeError, ConnectionResetError):
+            pass  # the client timed out during --delay
+
+    def log_message(self, format, *args):
+        pass
+
+
+def make_fake_server(port=0, delay=0.0):
+    """Return (server, events URL); port=0 picks a free port."""
+    handler = type("Handler", (FakeTicketmasterHandler,), {"delay": delay, "requests": 0})
+    server  = ThreadingHTTPServer(("127.0.0.1", port), handler)
+    return server, f"http://127.0.0.1:{server.server_port}/discovery/v2/events.json"
+
+
+def start_fake_server(port=0, delay=0.0):
+    """Run the fake provider in a background thread, e.g. from a test."""
+    server, url = make_fake_server(port, delay)
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    return server, url
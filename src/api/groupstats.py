@@ -0,0 +1,159 @@
+"""
+Materialized per-group plan statistics and Hall of Fame.
+
+GroupStat keeps, per group and bucket, how many plans there are, how many
+are rated and the sum of their ratings. The buckets are the group total,
+each status, each category and each organizer. GroupHallOfFame keeps the
+HALL_OF_FAME_SIZE best-rated plans. Routes snapshot a plan before and after
+they change it, and record_plan_stats() applies the difference inside their
+transaction, so reads never go through the group's plan history. Writers
+lock the group row first (SELECT ... FOR UPDATE, a no-op on SQLite), so two
+changes to the same group can't both insert a bucket or refill its Hall of
+Fame at once.
+flask rebuild-group-stats recomputes both tables from the plan table.
+"""
+from sqlalchemy import select, update, delete, insert, func, bindparam
+
+from api.models import db, User, Group, Plan, GroupStat, GroupHallOfFame, PlanStatus, group_members
+from api.queries import plan_query, usernames
+
+HALL_OF_FAME_SIZE = 5
+TOP_ORGANIZERS    = 5
+
+
+def stats_snapshot(plan):
+    """The (dimension, bucket) keys the plan counts in, and its rating."""
+    buckets = [("total", ""), ("status", plan.status.value), ("category", plan.category or "")]
+    if plan.organizer_id is not None:
+        buckets.append(("organizer", str(plan.organizer_id)))
+    return buckets, plan.rating
+
+
+def stat_deltas(before, after):
+    """{(dimension, bucket): [plans, rated, rating_sum]} to go from before to after (None = no plan)."""
+    deltas = {}
+    for snapshot, sign in ((before, -1), (after, 1)):
+        if snapshot is None:
+            continue
+        buckets, rating = snapshot
+        for key in buckets:
+            delta     = deltas.setdefault(key, [0, 0, 0.0])
+            delta[0] += sign
+            if rating is not None:
+                delta[1] += sign
+                delta[2] += sign * rating
+    return {key: delta for key, delta in deltas.items() if any(delta)}
+
+
+def record_plan_stats(group_id, plan_id, before, after):
+    """Apply one plan's change to the group's counters and Hall of Fame, in the caller's transaction."""
+    deltas     = stat_deltas(before, after)
+    old_rating = before[1] if before else None
+    new_rating = after[1] if after else None
+    if not deltas and old_rating == new_rating:
+        return
+    db.session.execute(select(Group.id).where(Group.id == group_id).with_for_update())
+    if deltas:
+        existing = set(db.session.execute(
+            select(GroupStat.dimension, GroupStat.bucket).where(GroupStat.group_id == group_id)).all())
+        table = GroupStat.__table__
+        rows  = [{"g": group_id, "d": dim, "b": bucket, "p": p, "r": r, "s": s}
+                 for (dim, bucket), (p, r, s) in deltas.items() if (dim, bucket) in existing]
+        if rows:
+            db.session.connection().execute(
+                update(table)
+                .where(table.c.group_id == bindparam("g"), table.c.dimension == bindparam("d"),
+                       table.c.bucket == bindparam("b"))
+                .values(plans=table.c.plans + bindparam("p"), rated=table.c.rated + bindparam("r"),
+                        rating_sum=table.c.rating_sum + bindparam("s")), rows)
+        db.session.add_all([GroupStat(group_id=group_id, dimension=dim, bucket=bucket, plans=p, rated=r, rating_sum=s)
+                            for (dim, bucket), (p, r, s) in deltas.items() if (dim, bucket) not in existing])
+    if old_rating != new_rating:
+        update_hall_of_fame(group_id, plan_id, new_rating)
+
+
+def update_hall_of_fame(group_id, plan_id, new_rating):
+    hall = dict(db.session.execute(select(GroupHallOfFame.plan_id, GroupHallOfFame.rating)
+                                   .where(GroupHallOfFame.group_id == group_id)).all())
+    if (plan_id not in hall and len(hall) >= HALL_OF_FAME_SIZE
+            and (new_rating is None or new_rating < min(hall.values()))):
+        return  # wasn't in it and doesn't get in
+    # Refill from ix_plan_group_rating: a plan leaving the top needs the next best one
+    db.session.execute(delete(GroupHallOfFame).where(GroupHallOfFame.group_id == group_id))
+    top = db.session.execute(select(Plan.group_id, Plan.id.label("plan_id"), Plan.rating)
+                             .where(Plan.group_id == group_id, Plan.rating.isnot(None))
+                             .order_by(Plan.rating.desc(), Plan.id).limit(HALL_OF_FAME_SIZE)).mappings().all()
+    if top:
+        db.session.execute(insert(GroupHallOfFame), [dict(row) for row in top])
+
+
+def hall_of_fame_query(group_id):
+    return (plan_query("plan_list")
+            .join(GroupHallOfFame, GroupHallOfFame.plan_id == Plan.id)
+            .filter(GroupHallOfFame.group_id == group_id)
+            .order_by(GroupHallOfFame.rating.desc(), Plan.id))
+
+
+def average(rated, rating_sum):
+    return round(rating_sum / rated, 2) if rated else None
+
+
+def group_stats(group_id):
+    """The stats view: totals, per status and category, top organizers and member cancellations."""
+    rows    = db.session.scalars(select(GroupStat).where(GroupStat.group_id == group_id, GroupStat.plans > 0)).all()
+    by_dim  = {}
+    for row in rows:
+        by_dim.setdefault(row.dimension, []).append(row)
+    total   = (by_dim.get("total") or [GroupStat(plans=0, rated=0, rating_sum=0)])[0]
+    leaders = sorted(by_dim.get("organizer", []),
+                     key=lambda r: (-r.plans, -(average(r.rated, r.rating_sum) or 0), int(r.bucket)))[:TOP_ORGANIZERS]
+    names   = usernames([int(r.bucket) for r in leaders])
+    members = db.session.execute(
+        select(User.id, User.username, User.cancellations)
+        .join(group_members, group_members.c.user_id == User.id)
+        .where(group_members.c.group_id == group_id, User.cancellations > 0)
+        .order_by(User.cancellations.desc(), User.id)).all()
+    status_counts = {row.bucket: row.plans for row in by_dim.get("status", [])}
+    return {
+        "group_id":    group_id,
+        "plans":       total.plans,
+        "rated_plans": total.rated,
+        "avg_rating":  average(total.rated, total.rating_sum),
+        "by_status":   {status.value: status_counts.get(status.value, 0) for status in PlanStatus},
+        "categories":  [{"category": r.bucket, "plans": r.plans, "avg_rating": average(r.rated, r.rating_sum)}
+                        for r in sorted(by_dim.get("category", []), key=lambda r: (-r.plans, r.bucket))],
+        "top_organizers": [{"user_id": int(r.bucket), "username": names.get(int(r.bucket)), "plans": r.plans,
+                            "avg_rating": average(r.rated, r.rating_sum)} for r in leaders],
+        "cancellations":  [{"user_id": uid, "username": username, "cancellations": n}
+                           for uid, username, n in members],
+    }
+
+
+def rebuild_group_stats():
+    """Recompute GroupStat and GroupHallOfFame from the plan table. Returns the number of groups."""
+    db.session.execute(delete(GroupStat))
+    db.session.execute(delete(GroupHallOfFame))
+    counters = (func.count(), func.count(Plan.rating), func.coalesce(func.sum(Plan.rating), 0))
+    rows     = []
+    for dimension, column in (("total", None), ("status", Plan.status), ("category", Plan.category),
+                              ("organizer", Plan.organizer_id)):
+        keys = (Plan.group_id,) + ((column,) if column is not None else ())
+        for row in db.session.execute(select(*keys, *counters).group_by(*keys)):
+            group_id, bucket         = row[0], (row[1] if column is not None else "")
+            plans, rated, rating_sum = row[-3:]
+            if dimension == "organizer" and bucket is None:
+                continue
+            bucket = bucket.value if isinstance(bucket, PlanStatus) else str(bucket or "")
+            rows.append({"group_id": group_id, "dimension": dimension, "bucket": bucket,
+                         "plans": plans, "rated": rated, "rating_sum": rating_sum})
+    if rows:
+        db.session.execute(insert(GroupStat), rows)
+    position = func.row_number().over(partition_by=Plan.group_id, order_by=(Plan.rating.desc(), Plan.id))
+    ranked   = (select(Plan.group_id, Plan.id.label("plan_id"), Plan.rating, position.label("position"))
+                .where(Plan.rating.isnot(None)).subquery())
+    top      = db.session.execute(select(ranked.c.group_id, ranked.c.plan_id, ranked.c.rating)
+                                  .where(ranked.c.position <= HALL_OF_FAME_SIZE)).mappings().all()
+    if top:
+        db.session.execute(insert(GroupHallOfFame), [dict(row) for row in top])
+    db.session.commit()
+    return len({row["group_id"] for row in rows})
@@ -0,0 +1,94 @@
+from sqlalchemy import select, update, delete, func, bindparam, union_all
+
+from api.models import db, Group, Plan, Expense, ExpenseSplit, GroupBalance
+from api.etags import bump_groups
+
+EPSILON = 0.005
+
+
+def split_deltas(payer_id, splits, sign=1):
+    """Balance changes for (user_id, amount, is_paid) splits of one expense.
+
+    Only unpaid splits of someone other than the payer are outstanding debt:
+    the payer is owed the amount and the participant owes it.
+    """
+    deltas = {}
+    for uid, amount, is_paid in splits:
+        if is_paid or uid == payer_id or not amount:
+            continue
+        deltas[payer_id] = deltas.get(payer_id, 0) + sign * amount
+        deltas[uid]      = deltas.get(uid, 0)      - sign * amount
+    return deltas
+
+
+def apply_deltas(group_id, deltas):
+    """Add deltas to the group's running balances inside the caller's transaction."""
+    if not deltas:
+        return
+    # Lock the group row (a no-op on SQLite) so two first expenses can't both insert a balance
+    db.session.execute(select(Group.id).where(Group.id == group_id).with_for_update())
+    existing = set(db.session.scalars(balance_users_stmt(group_id, deltas)))
+    table = GroupBalance.__table__
+    rows  = [{"g": group_id, "u": uid, "d": delta} for uid, delta in deltas.items() if uid in existing]
+    if rows:
+        db.session.connection().execute(
+            update(table)
+            .where(table.c.group_id == bindparam("g"), table.c.user_id == bindparam("u"))
+            .values(balance=table.c.balance + bindparam("d")), rows)
+    db.session.add_all([GroupBalance(group_id=group_id, user_id=uid, balance=delta)
+                        for uid, delta in deltas.items() if uid not in existing])
+
+
+def balance_users_stmt(group_id, user_ids):
+    return (select(GroupBalance.user_id)
+            .where(GroupBalance.group_id == group_id, GroupBalance.user_id.in_(user_ids)))
+
+
+def payment_stmt(expense_id):
+    """(group_id, payer_id) of an expense."""
+    return (select(Plan.group_id, Expense.paid_by_id)
+            .join(Expense, Expense.plan_id == Plan.id)
+            .where(Expense.id == expense_id))
+
+
+def record_expense(group_id, payer_id, splits):
+    apply_deltas(group_id, split_deltas(payer_id, splits))
+
+
+def record_payment(split):
+    """A split was just marked paid: the participant no longer owes the payer."""
+    group_id, payer_id = db.session.execute(payment_stmt(split.expense_id)).one()
+    apply_deltas(group_id, split_deltas(payer_id, [(split.user_id, split.amount, False)], sign=-1))
+
+
+def computed_balances():
+    """{(group_id, user_id): balance} recomputed from every Expense/ExpenseSplit."""
+    outstanding = (select(Plan.group_id, Expense.paid_by_id, ExpenseSplit.user_id, ExpenseSplit.amount)
+                   .join(Expense, Expense.plan_id == Plan.id)
+                   .join(ExpenseSplit, ExpenseSplit.expense_id == Expense.id)
+                   .where(ExpenseSplit.is_paid.is_(False), ExpenseSplit.user_id != Expense.paid_by_id)
+                   .subquery())
+    moves = union_all(
+        select(outstanding.c.group_id, outstanding.c.paid_by_id.label("user_id"), outstanding.c.amount),
+        select(outstanding.c.group_id, outstanding.c.user_id, -outstanding.c.amount),
+    ).subquery()
+    stmt = select(moves.c.group_id, moves.c.user_id, func.sum(moves.c.amount)).group_by(moves.c.group_id, moves.c.user_id)
+    return {(gid, uid): total for gid, uid, total in db.session.execute(stmt)}
+
+
+def rebuild_ledger(fix=True):
+    """Compare the cached balances with the recomputed ones. Returns the drifted keys.
+
+    With fix, the groups that drifted get a new version (ETag).
+    """
+    expected = computed_balances()
+    cached   = {(b.group_id, b.user_id): b.balance for b in GroupBalance.query}
+    drift    = sorted(key for key in expected.keys() | cached.keys()
+                      if abs(expected.get(key, 0) - cached.get(key, 0)) > EPSILON)
+    if fix:
+        db.session.execute(delete(GroupBalance))
+        db.session.add_all([GroupBalance(group_id=gid, user_id=uid, balance=total)
+                            for (gid, uid), total in expected.items()])
+        bump_groups({gid for gid, _ in drift})
+        db.session.commit()
+    return drift
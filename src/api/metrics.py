@@ -0,0 +1,189 @@
+"""
+Per-request SQL and latency instrumentation, exported at /metrics.
+
+Cursor events on every Engine count each request's queries and add up
+their time, keeping the slowest statement. JSON encoding and schema
+serialization are timed too. For routes in the api blueprint every request
+is then recorded in a set of Prometheus histograms labelled by route and
+method: latency, queries, DB time and serialization. With debug on (or
+METRICS_HEADERS=1) the same numbers are sent back as X-DB-* headers and
+Server-Timing.
+
+Scrapes send Authorization: Bearer <METRICS_TOKEN>. Without a token
+/metrics is only served with debug on (or under testing); in production it
+is a 404 until METRICS_TOKEN is set.
+
+The histograms live in the worker process's memory, so with several
+gunicorn workers each scrape sees one worker. The cost is a couple of
+perf_counter() calls per query and one lock per request.
+"""
+import bisect
+import hmac
+import os
+import threading
+import time
+from flask import Response, abort, g, request, has_request_context
+from flask.json.provider import DefaultJSONProvider
+from sqlalchemy import event
+from sqlalchemy.engine import Engine
+
+from api.ticketmaster import event_search
+
+METRICS_TOKEN   = os.getenv("METRICS_TOKEN", "")
+METRICS_HEADERS = os.getenv("METRICS_HEADERS") == "1"
+
+LATENCY_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1, 2.5, 5, 10)
+QUERY_BUCKETS   = (0, 1, 2, 3, 5, 8, 13, 21, 34, 55, 89)
+
+
+class RequestStats:
+    __slots__ = ("queries", "db_time", "slowest", "slowest_sql", "serialize_time")
+
+    def __init__(self):
+        self.queries, self.db_time, self.serialize_time = 0, 0.0, 0.0
+        self.slowest, self.slowest_sql = 0.0, None
+
+
+class Histogram:
+
+    def __init__(self, name, help, buckets):
+        self.name, self.help, self.buckets = name, help, buckets
+        self.series = {}  # labels -> [count per bucket..., +Inf count, sum]
+
+    def observe(self, labels, value):
+        series = self.series.get(labels)
+        if series is None:
+            series = self.series[labels] = [0] * (len(self.buckets) + 1) + [0.0]
+        series[bisect.bisect_left(self.buckets, value)] += 1
+        series[-1] += value
+
+    def render(self):
+        lines = [f"# HELP {self.name} {self.help}", f"# TYPE {self.name} histogram"]
+        for labels, series in sorted(self.series.items()):
+            base, total = _labels(labels), 0
+            for bound, count in zip(self.buckets + ("+Inf",), series):
+                total += count
+                lines.append(f'{self.name}_bucket{{{base},le="{bound}"}} {total}')
+            lines.append(f"{self.name}_sum{{{base}}} {series[-1]:.6f}")
+            lines.append(f"{self.name}_count{{{base}}} {total}")
+        return lines
+
+
+def _labels(labels):
+    route, method = labels
+    return f'route="{route}",method="{method}"'
+
+
+_lock      = threading.Lock()
+_status    = {}  # (route, method, status) -> count
+HISTOGRAMS = {
+    "latency":   Histogram("amigoplan_request_duration_seconds", "Time spent in the view, per route.", LATENCY_BUCKETS),
+    "queries":   Histogram("amigoplan_db_queries_per_request", "SQL statements executed per request.", QUERY_BUCKETS),
+    "db_time":   Histogram("amigoplan_db_duration_seconds", "Total SQL time per request.", LATENCY_BUCKETS),
+    "serialize": Histogram("amigoplan_serialize_duration_seconds", "Serialization and JSON encoding time per request.",
+                           LATENCY_BUCKETS),
+}
+
+
+def current_stats():
+    if not has_request_context():
+        return None
+    return g.get("request_stats")
+
+
+def add_serialize_time(seconds):
+    stats = current_stats()
+    if stats is not None:
+        stats.serialize_time += seconds
+
+
+@event.listens_for(Engine, "before_cursor_execute")
+def _query_started(conn, cursor, statement, parameters, context, executemany):
+    conn.info["query_started"] = time.perf_counter()
+
+
+@event.listens_for(Engine, "after_cursor_execute")
+def _query_finished(conn, cursor, statement, parameters, context, executemany):
+    stats = current_stats()
+    if stats is None:
+        return
+    elapsed = time.perf_counter() - conn.info.pop("query_started", time.perf_counter())
+    stats.queries += 1
+    stats.db_time += elapsed
+    if elapsed > stats.slowest:
+        stats.slowest, stats.slowest_sql = elapsed, statement
+
+
+class TimedJSONProvider(DefaultJSONProvider):
+    """Flask's JSON provider, timing jsonify() for the request stats."""
+
+    def response(self, *args, **kwargs):
+        started  = time.perf_counter()
+        response = super().response(*args, **kwargs)
+        add_serialize_time(time.perf_counter() - started)
+        return response
+
+
+def setup_metrics(app):
+    app.json = TimedJSONProvider(app)
+
+    @app.before_request
+    def start_request_stats():
+        g.request_stats   = RequestStats()
+        g.request_started = time.perf_counter()
+
+    @app.after_request
+    def record_request_stats(response):
+        stats = g.get("request_stats")
+        if stats is None:
+            return response
+        elapsed = time.perf_counter() - g.request_started
+        if request.blueprint == "api" and request.url_rule is not None:
+            labels = (request.url_rule.rule, request.method)
+            with _lock:
+                HISTOGRAMS["latency"].observe(labels, elapsed)
+                HISTOGRAMS["queries"].observe(labels, stats.queries)
+                HISTOGRAMS["db_time"].observe(labels, stats.db_time)
+                HISTOGRAMS["serialize"].observe(labels, stats.serialize_time)
+                key = labels + (response.status_code,)
+                _status[key] = _status.get(key, 0) + 1
+        if app.debug or METRICS_HEADERS:
+            response.headers["X-DB-Queries"]    = str(stats.queries)
+            response.headers["X-DB-Time-ms"]    = f"{stats.db_time * 1000:.1f}"
+            response.headers["X-DB-Slowest-ms"] = f"{stats.slowest * 1000:.1f}"
+            response.headers["X-Serialize-ms"]  = f"{stats.serialize_time * 1000:.1f}"
+            if stats.slowest_sql:
+                response.headers["X-DB-Slowest-SQL"] = " ".join(stats.slowest_sql.split())[:300]
+            response.headers["Server-Timing"] = (f"db;dur={stats.db_time * 1000:.1f}, "
+                                                 f"serialize;dur={stats.serialize_time * 1000:.1f}, "
+                                                 f"total;dur={elapsed * 1000:.1f}")
+        return response
+
+    @app.route('/metrics')
+    def metrics():
+        if not METRICS_TOKEN:
+            if not (app.debug or app.testing):
+                abort(404)  # fail closed: no token, no public metrics
+        elif not hmac.compare_digest(request.headers.get("Authorization", ""), f"Bearer {METRICS_TOKEN}"):
+            return Response("unauthorized\n", status=401, mimetype="text/plain")
+        return Response("\n".join(render()) + "\n", mimetype="text/plain; version=0.0.4")
+
+
+def render():
+    lines = []
+    with _lock:
+        for histogram in HISTOGRAMS.values():
+            lines += histogram.render()
+        lines += ["# HELP amigoplan_requests_total Requests per route, method and status.",
+                  "# TYPE amigoplan_requests_total counter"]
+        for (route, method, status), count in sorted(_status.items()):
+            lines.append(f'amigoplan_requests_total{{{_labels((route, method))},status="{status}"}} {count}')
+    stats = event_search.stats()
+    lines += ["# HELP amigoplan_ticketmaster_cache_total Ticketmaster search cache outcomes.",
+              "# TYPE amigoplan_ticketmaster_cache_total counter"]
+    for result in ("hits", "stale_hits", "misses", "refreshes", "errors"):
+        lines.append(f'amigoplan_ticketmaster_cache_total{{result="{result}"}} {stats[result]}')
+    lines += ["# HELP amigoplan_ticketmaster_cache_entries Cached Ticketmaster searches.",
+              "# TYPE amigoplan_ticketmaster_cache_entries gauge",
+              f"amigoplan_ticketmaster_cache_entries {stats['size']}"]
+    return lines
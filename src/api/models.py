@@ -1,5 +1,6 @@
 from flask_sqlalchemy import SQLAlchemy
-from sqlalchemy import String, Integer, Float, Boolean, Text, DateTime, Enum, ForeignKey, Table, Column
+from sqlalchemy import (String, Integer, Float, Boolean, Text, DateTime, Enum, ForeignKey, Table, Column, Index,
+                        DDL, event, func)
 from sqlalchemy.orm import Mapped, mapped_column, relationship
 from typing import List, Optional
 from datetime import datetime
@@ -29,6 +30,7 @@ group_members = Table(
     "group_members", db.metadata,
     Column("user_id",  Integer, ForeignKey("user.id"),  primary_key=True),
     Column("group_id", Integer, ForeignKey("group.id"), primary_key=True),
+    Index("ix_group_members_group", "group_id", "user_id"),
 )
 
 class User(db.Model):
@@ -55,6 +57,14 @@ class User(db.Model):
             "cancellations": self.cancellations, "created_at": self.created_at.isoformat(),
         }
 
+# Username search (api.usersearch) on Postgres: lower(username) prefixes and substrings
+Index("ix_user_username_lower", func.lower(User.username).label("username_lower"),
+      postgresql_ops={"username_lower": "text_pattern_ops"}).ddl_if(dialect="postgresql")
+Index("ix_user_username_trgm", func.lower(User.username).label("username_lower"), postgresql_using="gin",
+      postgresql_ops={"username_lower": "gin_trgm_ops"}).ddl_if(dialect="postgresql")
+event.listen(User.__table__, "before_create",
+             DDL("CREATE EXTENSION IF NOT EXISTS pg_trgm").execute_if(dialect="postgresql"))
+
 class Group(db.Model):
     id:          Mapped[int]      = mapped_column(primary_key=True)
     name:        Mapped[str]      = mapped_column(String(100), nullable=False)
@@ -62,23 +72,32 @@ class Group(db.Model):
     emoji:       Mapped[str]      = mapped_column(String(10), default="🎉")
     admin_id:    Mapped[int]      = mapped_column(ForeignKey("user.id"), nullable=False)
     created_at:  Mapped[datetime] = mapped_column(DateTime, default=datetime.utcnow)
+    version:     Mapped[int]      = mapped_column(Integer, default=1, server_default="1")  # ETag, see api.etags
 
     admin:   Mapped["User"]       = relationship("User", foreign_keys=[admin_id], back_populates="groups_admin")
     members: Mapped[List["User"]] = relationship("User", secondary=group_members, back_populates="groups")
     plans:   Mapped[List["Plan"]] = relationship("Plan", back_populates="group", cascade="all, delete-orphan")
 
-    def serialize(self):
+    def serialize(self, members=None, member_count=None):
+        # members/member_count may be preloaded in bulk (see api.queries.group_summaries)
+        members = self.members if members is None else members
         return {
             "id": self.id, "name": self.name, "description": self.description,
             "emoji": self.emoji, "admin_id": self.admin_id,
             "admin_username": self.admin.username if self.admin else None,
-            "member_count": len(self.members),
+            "member_count": len(members) if member_count is None else member_count,
             "members": [{"id": m.id, "username": m.username,
                          "avatar_initial": m.username[0].upper(), "avatar_color": m.avatar_color}
-                        for m in self.members],
+                        for m in members],
         }
 
 class Plan(db.Model):
+    __table_args__ = (
+        Index("ix_plan_group_created", "group_id", "created_at", "id"),
+        Index("ix_plan_created", "created_at", "id"),
+        Index("ix_plan_group_rating", "group_id", "rating"),
+    )
+
     id:             Mapped[int]               = mapped_column(primary_key=True)
     title:          Mapped[str]               = mapped_column(String(150), nullable=False)
     description:    Mapped[str]               = mapped_column(Text, default="")
@@ -99,6 +118,11 @@ class Plan(db.Model):
     template:       Mapped[Optional[str]]     = mapped_column(String(50),  nullable=True)
     created_at:     Mapped[datetime]          = mapped_column(DateTime, default=datetime.utcnow)
     closed_at:      Mapped[Optional[datetime]] = mapped_column(DateTime, nullable=True)
+    # Vote tallies, kept in sync by api.tallies in the same transaction as the vote
+    votes_si:          Mapped[int]            = mapped_column(Integer, default=0, server_default="0")
+    votes_no:          Mapped[int]            = mapped_column(Integer, default=0, server_default="0")
+    votes_me_da_igual: Mapped[int]            = mapped_column(Integer, default=0, server_default="0")
+    version:           Mapped[int]            = mapped_column(Integer, default=1, server_default="1")  # ETag, see api.etags
 
     group:      Mapped["Group"]             = relationship("Group", back_populates="plans")
     organizer:  Mapped[Optional["User"]]    = relationship("User", foreign_keys=[organizer_id], back_populates="plans_org")
@@ -108,6 +132,10 @@ class Plan(db.Model):
     options:    Mapped[List["PlanOption"]]  = relationship("PlanOption", back_populates="plan",  cascade="all, delete-orphan")
     memories:   Mapped[List["PlanMemory"]]  = relationship("PlanMemory", back_populates="plan",  cascade="all, delete-orphan")
 
+    def vote_counts(self):
+        return {"si": self.votes_si or 0, "no": self.votes_no or 0,
+                "me_da_igual": self.votes_me_da_igual or 0}
+
     def serialize(self):
         return {
             "id": self.id, "title": self.title, "description": self.description,
@@ -126,25 +154,37 @@ class Plan(db.Model):
         }
 
 class PlanOption(db.Model):
+    __table_args__ = (Index("ix_plan_option_plan", "plan_id"),)
+
     id:             Mapped[int]             = mapped_column(primary_key=True)
     plan_id:        Mapped[int]             = mapped_column(ForeignKey("plan.id"), nullable=False)
     title:          Mapped[str]             = mapped_column(String(150), nullable=False)
     description:    Mapped[str]             = mapped_column(Text, default="")
     location:       Mapped[str]             = mapped_column(String(200), default="")
     estimated_cost: Mapped[Optional[float]] = mapped_column(Float, nullable=True)
+    votes_si:          Mapped[int]          = mapped_column(Integer, default=0, server_default="0")
+    votes_no:          Mapped[int]          = mapped_column(Integer, default=0, server_default="0")
+    votes_me_da_igual: Mapped[int]          = mapped_column(Integer, default=0, server_default="0")
 
     plan:  Mapped["Plan"]       = relationship("Plan", back_populates="options")
     votes: Mapped[List["Vote"]] = relationship("Vote", back_populates="option")
 
+    def vote_counts(self):
+        return {"si": self.votes_si or 0, "no": self.votes_no or 0,
+                "me_da_igual": self.votes_me_da_igual or 0}
+
     def serialize(self):
-        counts = {"si": 0, "no": 0, "me_da_igual": 0}
-        for v in self.votes:
-            counts[v.vote_type.value] += 1
         return {"id": self.id, "plan_id": self.plan_id, "title": self.title,
                 "description": self.description, "location": self.location,
-                "estimated_cost": self.estimated_cost, "vote_counts": counts}
+                "estimated_cost": self.estimated_cost, "vote_counts": self.vote_counts()}
 
 class Vote(db.Model):
+    __table_args__ = (
+        Index("ix_vote_plan_created", "plan_id", "created_at", "id"),
+        Index("ix_vote_plan_user_option", "plan_id", "user_id", "option_id"),
+        Index("ix_vote_option", "option_id"),
+    )
+
     id:         Mapped[int]             = mapped_column(primary_key=True)
     plan_id:    Mapped[int]             = mapped_column(ForeignKey("plan.id"),        nullable=False)
     option_id:  Mapped[Optional[int]]   = mapped_column(ForeignKey("plan_option.id"), nullable=True)
@@ -162,6 +202,8 @@ class Vote(db.Model):
                 "user_id": self.user_id, "vote_type": self.vote_type.value, "is_veto": self.is_veto}
 
 class Expense(db.Model):
+    __table_args__ = (Index("ix_expense_plan_created", "plan_id", "created_at", "id"),)
+
     id:           Mapped[int]       = mapped_column(primary_key=True)
     plan_id:      Mapped[int]       = mapped_column(ForeignKey("plan.id"),  nullable=False)
     description:  Mapped[str]       = mapped_column(String(200), nullable=False)
@@ -182,6 +224,11 @@ class Expense(db.Model):
                 "created_at": self.created_at.isoformat()}
 
 class ExpenseSplit(db.Model):
+    __table_args__ = (
+        Index("ix_expense_split_expense", "expense_id"),
+        Index("ix_expense_split_user", "user_id"),
+    )
+
     id:         Mapped[int]   = mapped_column(primary_key=True)
     expense_id: Mapped[int]   = mapped_column(ForeignKey("expense.id"), nullable=False)
     user_id:    Mapped[int]   = mapped_column(ForeignKey("user.id"),    nullable=False)
@@ -197,6 +244,8 @@ class ExpenseSplit(db.Model):
                 "amount": self.amount, "is_paid": self.is_paid}
 
 class PlanMemory(db.Model):
+    __table_args__ = (Index("ix_plan_memory_plan_created", "plan_id", "created_at", "id"),)
+
     id:         Mapped[int]      = mapped_column(primary_key=True)
     plan_id:    Mapped[int]      = mapped_column(ForeignKey("plan.id"), nullable=False)
     user_id:    Mapped[int]      = mapped_column(ForeignKey("user.id"), nullable=False)
@@ -210,3 +259,36 @@ class PlanMemory(db.Model):
         return {"id": self.id, "plan_id": self.plan_id, "user_id": self.user_id,
                 "username": self.user.username if self.user else None,
                 "phrase": self.phrase, "created_at": self.created_at.isoformat()}
+
+
+class GroupBalance(db.Model):
+    # Running outstanding balance per member across all of a group's plans
+    # (positive = is owed money). Maintained by api.ledger.
+    group_id: Mapped[int]   = mapped_column(ForeignKey("group.id"), primary_key=True)
+    user_id:  Mapped[int]   = mapped_column(ForeignKey("user.id"),  primary_key=True)
+    balance:  Mapped[float] = mapped_column(Float, default=0)
+
+    user: Mapped["User"] = relationship("User")
+
+    def serialize(self):
+        return {"group_id": self.group_id, "user_id": self.user_id,
+                "username": self.user.username if self.user else None,
+                "balance": round(self.balance, 2)}
+
+
+class GroupStat(db.Model):
+    # Plan counters per group and bucket: ("total", ""), ("status", "cerrado"),
+    # ("category", "cena") or ("organizer", "<user id>"). Maintained by api.groupstats.
+    group_id:   Mapped[int]   = mapped_column(ForeignKey("group.id"), primary_key=True)
+    dimension:  Mapped[str]   = mapped_column(String(20), primary_key=True)
+    bucket:     Mapped[str]   = mapped_column(String(50), primary_key=True)
+    plans:      Mapped[int]   = mapped_column(Integer, default=0)
+    rated:      Mapped[int]   = mapped_column(Integer, default=0)
+    rating_sum: Mapped[float] = mapped_column(Float, default=0)
+
+
+class GroupHallOfFame(db.Model):
+    # The group's best-rated plans (api.groupstats.HALL_OF_FAME_SIZE of them)
+    group_id: Mapped[int]   = mapped_column(ForeignKey("group.id"), primary_key=True)
+    plan_id:  Mapped[int]   = mapped_column(ForeignKey("plan.id"),  primary_key=True)
+    rating:   Mapped[float] = mapped_column(Float, nullable=False)
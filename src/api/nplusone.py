@@ -0,0 +1,101 @@
+"""
+N+1 detection and per-route query budgets for development and tests.
+
+While debug or testing is on (or NPLUSONE=1), lazy loads during a request
+are tracked per (model, relationship). Once the same relationship has
+lazy-loaded for NPLUSONE_THRESHOLD different instances, it is reported with the route,
+the repeated SQL and the app call site. The report is logged in
+development and raised as NPlusOneError under testing, so the test fails.
+
+@query_budget(n) on a view caps the statements one request may run (as
+counted by api.metrics). Going over is logged in development, and raises
+QueryBudgetExceeded under testing. In production only the budgets are
+looked up, nothing else.
+"""
+import os
+import traceback
+from flask import current_app, g, request, has_request_context
+from sqlalchemy import event
+from sqlalchemy.orm import Session
+
+NPLUSONE           = os.getenv("NPLUSONE") == "1"
+NPLUSONE_THRESHOLD = int(os.getenv("NPLUSONE_THRESHOLD", 2))
+SOURCE_ROOT        = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+
+class NPlusOneError(Exception):
+    pass
+
+
+class QueryBudgetExceeded(Exception):
+    pass
+
+
+def query_budget(max_queries):
+    def decorator(view):
+        view.query_budget = max_queries
+        return view
+    return decorator
+
+
+def _enabled():
+    return NPLUSONE or current_app.debug or current_app.testing
+
+
+def _call_site():
+    # Innermost frames in our own code (models, routes...), skipping this module
+    frames = [f for f in traceback.extract_stack()[:-2]
+              if f.filename.startswith(SOURCE_ROOT) and f.filename != __file__]
+    return " <- ".join(f"{os.path.relpath(f.filename, SOURCE_ROOT)}:{f.lineno} in {f.name}"
+                       for f in reversed(frames[-3:]))
+
+
+def _report(message):
+    if current_app.testing:
+        raise NPlusOneError(message)
+    current_app.logger.warning(message)
+    g.nplusone_reports = g.get("nplusone_reports", 0) + 1
+
+
+@event.listens_for(Session, "do_orm_execute")
+def _track_lazy_load(state):
+    if not state.is_select or state.lazy_loaded_from is None or not has_request_context() or not _enabled():
+        return
+    relationship = state.loader_strategy_path[-1]
+    key          = (state.lazy_loaded_from.class_.__name__, relationship.key)
+    # Distinct parents: reloading one object's relationship after a commit is not an N+1
+    parents = g.setdefault("lazy_loads", {}).setdefault(key, set())
+    parents.add(id(state.lazy_loaded_from))
+    if len(parents) == NPLUSONE_THRESHOLD:
+        route = request.url_rule.rule if request.url_rule else request.path
+        _report(f"N+1 en {request.method} {route}: {key[0]}.{key[1]} se carga en bucle "
+                f"({NPLUSONE_THRESHOLD}+ lazy loads)\n"
+                f"    SQL: {' '.join(str(state.statement).split())}\n"
+                f"    en: {_call_site()}")
+
+
+def setup_nplusone(app):
+
+    @app.before_request
+    def reset_lazy_loads():
+        # g outlives the request when an app context was already pushed (tests, CLI)
+        g.pop("lazy_loads", None)
+        g.pop("nplusone_reports", None)
+
+    @app.after_request
+    def check_query_budget(response):
+        if g.get("nplusone_reports"):
+            response.headers["X-NPlusOne"] = str(g.nplusone_reports)
+        view   = app.view_functions.get(request.endpoint)
+        budget = getattr(view, "query_budget", None)
+        stats  = g.get("request_stats")
+        if budget is None or stats is None or stats.queries <= budget:
+            return response
+        message = (f"{request.method} {request.url_rule.rule}: {stats.queries} consultas, "
+                   f"presupuesto {budget}")
+        if app.testing:
+            raise QueryBudgetExceeded(message)
+        if app.debug or NPLUSONE:
+            app.logger.warning(message)
+            response.headers["X-Query-Budget"] = f"{stats.queries}/{budget}"
+        return response
@@ -0,0 +1,49 @@
+import base64
+import json
+from datetime import datetime
+from sqlalchemy import tuple_
+
+from api.utils import APIException
+
+DEFAULT_LIMIT = 50
+MAX_LIMIT     = 200
+
+
+def wants_page(args):
+    # Pagination is opt-in so existing clients that expect a bare list keep working.
+    return "limit" in args or "cursor" in args
+
+
+def encode_cursor(row):
+    raw = json.dumps([row.created_at.isoformat(), row.id]).encode()
+    return base64.urlsafe_b64encode(raw).decode().rstrip("=")
+
+
+def decode_cursor(cursor):
+    try:
+        raw = base64.urlsafe_b64decode(cursor + "=" * (-len(cursor) % 4))
+        created_at, row_id = json.loads(raw)
+        return datetime.fromisoformat(created_at), int(row_id)
+    except (ValueError, TypeError):
+        raise APIException("cursor inválido", 400)
+
+
+def keyset(query, model, after=None, newest_first=True):
+    """Order query by (created_at, id) and resume after the (created_at, id) pair."""
+    if after is not None:
+        key   = tuple_(model.created_at, model.id)
+        query = query.filter(key < tuple_(*after) if newest_first else key > tuple_(*after))
+    if newest_first:
+        return query.order_by(model.created_at.desc(), model.id.desc())
+    return query.order_by(model.created_at.asc(), model.id.asc())
+
+
+def paginate(query, model, args, newest_first=True):
+    """Keyset page over (created_at, id). Returns (rows, next_cursor)."""
+    limit  = max(1, min(args.get("limit", DEFAULT_LIMIT, type=int) or DEFAULT_LIMIT, MAX_LIMIT))
+    cursor = args.get("cursor")
+    after  = decode_cursor(cursor) if cursor else None
+    rows   = keyset(query, model, after, newest_first).limit(limit + 1).all()
+    if len(rows) > limit:
+        return rows[:limit], encode_cursor(rows[limit - 1])
+    return rows, None
@@ -0,0 +1,76 @@
+"""
+Password hashing off the request workers.
+
+KDF calls run in a small per-process pool (PASSWORD_HASH_WORKERS, 0 = inline)
+and at most PASSWORD_HASH_CONCURRENCY of them may be queued or running at
+once. Beyond that, requests wait up to PASSWORD_HASH_QUEUE_TIMEOUT seconds
+and then get a 503, instead of every worker thread piling up on the CPU.
+"""
+import multiprocessing
+import os
+import threading
+from concurrent.futures import ProcessPoolExecutor
+from werkzeug.security import generate_password_hash, check_password_hash
+
+from api.utils import APIException
+
+HASH_METHOD        = os.getenv("PASSWORD_HASH_METHOD", "scrypt:32768:8:1")
+HASH_WORKERS       = int(os.getenv("PASSWORD_HASH_WORKERS", 2))
+HASH_CONCURRENCY   = int(os.getenv("PASSWORD_HASH_CONCURRENCY", max(HASH_WORKERS, 1) * 4))
+HASH_QUEUE_TIMEOUT = float(os.getenv("PASSWORD_HASH_QUEUE_TIMEOUT", 10))
+
+_slots      = threading.BoundedSemaphore(HASH_CONCURRENCY)
+_pool_lock  = threading.Lock()
+_pool       = None
+_pool_pid   = None
+_method_tag = None
+
+
+def _executor():
+    # Pools don't survive a fork, so each (gunicorn) worker process builds its own
+    global _pool, _pool_pid
+    with _pool_lock:
+        if _pool is None or _pool_pid != os.getpid():
+            _pool     = ProcessPoolExecutor(HASH_WORKERS, mp_context=_mp_context())
+            _pool_pid = os.getpid()
+        return _pool
+
+
+def _mp_context():
+    # forkserver where available: forking a gthread worker straight away could
+    # copy a lock another thread holds into the child. The server starts clean
+    # and preloads werkzeug's KDF, so each child it forks is ready at once.
+    if "forkserver" not in multiprocessing.get_all_start_methods():
+        return multiprocessing.get_context()
+    context = multiprocessing.get_context("forkserver")
+    context.set_forkserver_preload(["werkzeug.security"])
+    return context
+
+
+def _run(fn, *args):
+    if not _slots.acquire(timeout=HASH_QUEUE_TIMEOUT):
+        raise APIException("Servidor ocupado, inténtalo de nuevo", 503)
+    try:
+        if HASH_WORKERS <= 0:
+            return fn(*args)
+        return _executor().submit(fn, *args).result()
+    finally:
+        _slots.release()
+
+
+def hash_password(password):
+    return _run(generate_password_hash, password, HASH_METHOD)
+
+
+def verify_password(stored_hash, password):
+    return _run(check_password_hash, stored_hash, password)
+
+
+def needs_rehash(stored_hash):
+    """True when stored_hash was made with other KDF parameters than HASH_METHOD."""
+    global _method_tag
+    if _method_tag is None:
+        # werkzeug fills in default parameters ("pbkdf2:sha256" -> "pbkdf2:sha256:1000000"),
+        # so compare against the prefix it actually writes
+        _method_tag = hash_password("").split("$", 1)[0]
+    return stored_hash.split("$", 1)[0] != _method_tag
@@ -0,0 +1,82 @@
+from sqlalchemy import select, func, union_all
+from sqlalchemy.orm import joinedload, selectinload
+
+from api.models import (db, User, Group, Plan, Expense, ExpenseSplit, PlanMemory, GroupBalance,
+                        group_members)
+
+# Loader options per endpoint: every relationship read by the endpoint's
+# serialize() is loaded up front, so the query count doesn't grow with the rows.
+LOAD_PROFILES = {
+    "plan_list":   (joinedload(Plan.organizer), joinedload(Plan.admin_user)),
+    "plan_detail": (joinedload(Plan.organizer), joinedload(Plan.admin_user)),
+    "group_list":  (joinedload(Group.admin),),
+    "group_ledger": (joinedload(GroupBalance.user),),
+    "expense_list": (joinedload(Expense.paid_by), selectinload(Expense.splits).joinedload(ExpenseSplit.user)),
+    "memory_list":  (joinedload(PlanMemory.user),),
+}
+
+
+def plan_query(profile):
+    return Plan.query.options(*LOAD_PROFILES[profile])
+
+
+def user_group_ids(user_id):
+    return select(group_members.c.group_id).where(group_members.c.user_id == user_id)
+
+
+def group_query(group_ids):
+    return Group.query.options(*LOAD_PROFILES["group_list"]).filter(Group.id.in_(group_ids)).order_by(Group.id)
+
+
+def group_summaries(group_ids, member_limit=None):
+    """Serialize many groups in two queries: groups + admins, then members.
+
+    group_ids may be a list or a select of ids. member_limit caps the embedded
+    member preview per group (at least 1: the count rides on the member rows);
+    member_count stays exact (window count).
+    """
+    groups = group_query(group_ids).all()
+    if not groups:
+        return []
+
+    by_group, counts = {}, {}
+    for row in db.session.execute(group_members_stmt([g.id for g in groups], member_limit)):
+        by_group.setdefault(row.group_id, []).append(row)
+        counts[row.group_id] = row.total
+    return [g.serialize(members=by_group.get(g.id, []), member_count=counts.get(g.id, 0))
+            for g in groups]
+
+
+def group_members_stmt(group_ids, member_limit=None):
+    gid     = group_members.c.group_id
+    members = (select(gid.label("group_id"), User.id, User.username, User.avatar_color,
+                      func.row_number().over(partition_by=gid, order_by=User.id).label("rn"),
+                      func.count().over(partition_by=gid).label("total"))
+               .join(User, User.id == group_members.c.user_id)
+               .where(gid.in_(group_ids))
+               .subquery())
+    stmt = select(members).order_by(members.c.group_id, members.c.rn)
+    if member_limit is not None:
+        stmt = stmt.where(members.c.rn <= max(member_limit, 1))
+    return stmt
+
+
+def plan_balances(plan_id):
+    """Net balance per user for a plan (paid minus owed) in one aggregate query."""
+    return {uid: amount for uid, amount in db.session.execute(plan_balances_stmt(plan_id))}
+
+
+def plan_balances_stmt(plan_id):
+    paid = (select(Expense.paid_by_id.label("user_id"), Expense.total_amount.label("amount"))
+            .where(Expense.plan_id == plan_id))
+    owed = (select(ExpenseSplit.user_id, (-ExpenseSplit.amount).label("amount"))
+            .join(Expense, Expense.id == ExpenseSplit.expense_id)
+            .where(Expense.plan_id == plan_id))
+    moves = union_all(paid, owed).subquery()
+    return select(moves.c.user_id, func.sum(moves.c.amount)).group_by(moves.c.user_id)
+
+
+def usernames(user_ids):
+    if not user_ids:
+        return {}
+    return dict(db.session.execute(select(User.id, User.username).where(User.id.in_(user_ids))).all())
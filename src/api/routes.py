@@ -1,14 +1,29 @@
 import os
-from flask import Blueprint, request, jsonify
+from flask import Blueprint, Response, request, jsonify, abort
 from flask_cors import CORS
 from flask_jwt_extended import create_access_token, jwt_required, get_jwt_identity
-from werkzeug.security import generate_password_hash, check_password_hash
 from datetime import datetime
 import random
 
 from api.models import (db, User, Group, Plan, PlanOption, Vote,
-                        Expense, ExpenseSplit, PlanMemory,
+                        Expense, ExpenseSplit, PlanMemory, GroupBalance,
                         PlanStatus, VoteType, SplitType)
+from api.queries import (LOAD_PROFILES, plan_query, user_group_ids, group_summaries,
+                         plan_balances, usernames)
+from api.settlement import settle
+from api.pagination import wants_page, paginate
+from api.tallies import record_vote
+from api.ledger import record_expense, record_payment
+from api.expenses import compute_splits, import_expenses, read_rows
+from api.ticketmaster import event_search
+from api.passwords import hash_password, verify_password, needs_rehash
+from api.auth import current_user
+from api.usersearch import autocomplete_users
+from api.etags import conditional, bump_plan, bump_group
+from api.serializers import json_response, serialize_all, stream_response
+from api.broker import plan_channel, publish, subscribe, event_stream
+from api.nplusone import query_budget
+from api.groupstats import stats_snapshot, record_plan_stats, group_stats, hall_of_fame_query
 from api.utils import APIException
 
 api = Blueprint('api', __name__)
@@ -34,7 +49,7 @@ def register():
         raise APIException("Username ya en uso", 409)
     user = User(
         email=email, username=username,
-        password=generate_password_hash(password),
+        password=hash_password(password),
         avatar_color=random.choice(AVATAR_COLORS),
         is_active=True
     )
@@ -52,8 +67,11 @@ def login():
     email    = body.get("email", "").strip().lower()
     password = body.get("password", "")
     user = User.query.filter_by(email=email).first()
-    if not user or not check_password_hash(user.password, password):
+    if not user or not verify_password(user.password, password):
         raise APIException("Credenciales incorrectas", 401)
+    if needs_rehash(user.password):
+        user.password = hash_password(password)
+        db.session.commit()
     token = create_access_token(identity=str(user.id))
     return jsonify({"token": token, "user": user.serialize()}), 200
 
@@ -61,7 +79,7 @@ def login():
 @api.route('/auth/me', methods=['GET'])
 @jwt_required()
 def get_me():
-    user = User.query.get(int(get_jwt_identity()))
+    user = current_user()
     if not user:
         raise APIException("Usuario no encontrado", 404)
     return jsonify(user.serialize()), 200
@@ -71,11 +89,13 @@ def get_me():
 
 @api.route('/users/search', methods=['GET'])
 @jwt_required()
+@query_budget(3)
 def search_users():
     q = request.args.get("q", "").strip()
     if not q or len(q) < 2:
         return jsonify([]), 200
-    users = User.query.filter(User.username.ilike(f"%{q}%")).limit(10).all()
+    scope = int(get_jwt_identity()) if request.args.get("scope") == "groups" else None
+    users = autocomplete_users(q, max(1, min(request.args.get("limit", 10, type=int), 50)), scope)
     return jsonify([u.serialize() for u in users]), 200
 
 
@@ -83,15 +103,16 @@ def search_users():
 
 @api.route('/groups', methods=['GET'])
 @jwt_required()
+@query_budget(2)
 def get_groups():
-    user = User.query.get(int(get_jwt_identity()))
-    return jsonify([g.serialize() for g in user.groups]), 200
+    member_limit = request.args.get("member_limit", type=int)
+    return jsonify(group_summaries(user_group_ids(int(get_jwt_identity())), member_limit)), 200
 
 
 @api.route('/groups', methods=['POST'])
 @jwt_required()
 def create_group():
-    user = User.query.get(int(get_jwt_identity()))
+    user = current_user()
     body = request.get_json()
     if not body or not body.get("name"):
         raise APIException("name es obligatorio", 400)
@@ -109,9 +130,13 @@ def create_group():
 
 @api.route('/groups/<int:group_id>', methods=['GET'])
 @jwt_required()
+@conditional("group")
+@query_budget(3)
 def get_group(group_id):
-    group = db.get_or_404(Group, group_id)
-    return jsonify(group.serialize()), 200
+    summaries = group_summaries([group_id], request.args.get("member_limit", type=int))
+    if not summaries:
+        abort(404)
+    return jsonify(summaries[0]), 200
 
 
 @api.route('/groups/<int:group_id>/invite', methods=['POST'])
@@ -126,6 +151,7 @@ def invite_to_group(group_id):
     if target in group.members:
         raise APIException("Ya es miembro del grupo", 409)
     group.members.append(target)
+    bump_group(group_id)
     db.session.commit()
     return jsonify(group.serialize()), 200
 
@@ -143,26 +169,33 @@ def spin_plan_master(group_id):
 
 @api.route('/plans', methods=['GET'])
 @jwt_required()
+@query_budget(1)
 def get_my_plans():
-    user         = User.query.get(int(get_jwt_identity()))
-    my_group_ids = [g.id for g in user.groups]
-    if not my_group_ids:
-        return jsonify([]), 200
-    plans = Plan.query.filter(Plan.group_id.in_(my_group_ids)).order_by(Plan.created_at.desc()).all()
-    return jsonify([p.serialize() for p in plans]), 200
+    query = plan_query("plan_list").filter(Plan.group_id.in_(user_group_ids(int(get_jwt_identity()))))
+    return plan_list_response(query)
 
 
 @api.route('/groups/<int:group_id>/plans', methods=['GET'])
 @jwt_required()
+@query_budget(1)
 def get_group_plans(group_id):
-    plans = Plan.query.filter_by(group_id=group_id).order_by(Plan.created_at.desc()).all()
-    return jsonify([p.serialize() for p in plans]), 200
+    return plan_list_response(plan_query("plan_list").filter_by(group_id=group_id))
+
+
+def plan_list_response(query):
+    if wants_page(request.args):
+        plans, next_cursor = paginate(query, Plan, request.args)
+        return json_response({"items": serialize_all(Plan, plans), "next_cursor": next_cursor})
+    query = query.order_by(Plan.created_at.desc())
+    if request.args.get("stream") == "1":
+        return stream_response(query, Plan)
+    return json_response(serialize_all(Plan, query.all()))
 
 
 @api.route('/plans', methods=['POST'])
 @jwt_required()
 def create_plan():
-    user = User.query.get(int(get_jwt_identity()))
+    user = current_user()
     body = request.get_json()
     if not body or not body.get("title") or not body.get("group_id"):
         raise APIException("title y group_id son obligatorios", 400)
@@ -191,21 +224,27 @@ def create_plan():
         template=body.get("template"),
     )
     db.session.add(plan)
+    db.session.flush()
+    record_plan_stats(group.id, plan.id, None, stats_snapshot(plan))
+    bump_group(group.id)
     db.session.commit()
     return jsonify(plan.serialize()), 201
 
 
 @api.route('/plans/<int:plan_id>', methods=['GET'])
 @jwt_required()
+@conditional("plan")
+@query_budget(2)
 def get_plan(plan_id):
-    return jsonify(db.get_or_404(Plan, plan_id).serialize()), 200
+    return jsonify(db.get_or_404(Plan, plan_id, options=LOAD_PROFILES["plan_detail"]).serialize()), 200
 
 
 @api.route('/plans/<int:plan_id>', methods=['PUT'])
 @jwt_required()
 def update_plan(plan_id):
-    plan = db.get_or_404(Plan, plan_id)
-    body = request.get_json()
+    plan   = db.get_or_404(Plan, plan_id, with_for_update=True)  # the stats snapshot must not go stale
+    body   = request.get_json()
+    before = stats_snapshot(plan)
     for field in ["title", "description", "location", "category",
                   "budget_level", "energy_level", "duration",
                   "challenge_type", "surprise_clue", "template"]:
@@ -222,6 +261,8 @@ def update_plan(plan_id):
             plan.scheduled_date = datetime.fromisoformat(body["scheduled_date"])
         except ValueError:
             pass
+    record_plan_stats(plan.group_id, plan_id, before, stats_snapshot(plan))
+    bump_plan(plan_id)
     db.session.commit()
     return jsonify(plan.serialize()), 200
 
@@ -229,14 +270,18 @@ def update_plan(plan_id):
 @api.route('/plans/<int:plan_id>/advance', methods=['POST'])
 @jwt_required()
 def advance_plan(plan_id):
-    plan  = db.get_or_404(Plan, plan_id)
+    plan  = db.get_or_404(Plan, plan_id, with_for_update=True)
     order = [PlanStatus.PROPUESTA, PlanStatus.VOTACION, PlanStatus.CONFIRMADO, PlanStatus.EN_CURSO, PlanStatus.CERRADO]
     idx   = order.index(plan.status)
     if idx < len(order) - 1:
+        before      = stats_snapshot(plan)
         plan.status = order[idx + 1]
         if plan.status == PlanStatus.CERRADO:
             plan.closed_at = datetime.utcnow()
+        record_plan_stats(plan.group_id, plan_id, before, stats_snapshot(plan))
+        bump_plan(plan_id)
         db.session.commit()
+        publish(plan_channel(plan_id), "plan", plan.serialize())
     return jsonify(plan.serialize()), 200
 
 
@@ -244,8 +289,10 @@ def advance_plan(plan_id):
 
 @api.route('/plans/<int:plan_id>/options', methods=['GET'])
 @jwt_required()
+@conditional("plan")
+@query_budget(2)
 def get_options(plan_id):
-    return jsonify([o.serialize() for o in PlanOption.query.filter_by(plan_id=plan_id).all()]), 200
+    return json_response(options_section(plan_id))
 
 
 @api.route('/plans/<int:plan_id>/options', methods=['POST'])
@@ -262,14 +309,17 @@ def add_option(plan_id):
         estimated_cost=body.get("estimated_cost"),
     )
     db.session.add(opt)
+    bump_plan(plan_id)
     db.session.commit()
+    publish(plan_channel(plan_id), "option", opt.serialize())
     return jsonify(opt.serialize()), 201
 
 
 @api.route('/plans/<int:plan_id>/vote', methods=['POST'])
 @jwt_required()
+@query_budget(7)
 def vote_plan(plan_id):
-    user      = User.query.get(int(get_jwt_identity()))
+    user      = current_user()
     body      = request.get_json()
     vote_type = body.get("vote_type", "si")
     is_veto   = body.get("is_veto", False)
@@ -277,6 +327,7 @@ def vote_plan(plan_id):
 
     existing = Vote.query.filter_by(plan_id=plan_id, user_id=user.id, option_id=option_id).first()
     if existing:
+        record_vote(plan_id, option_id, existing.vote_type, VoteType(vote_type))
         existing.vote_type = VoteType(vote_type)
         existing.is_veto   = is_veto
     else:
@@ -288,32 +339,69 @@ def vote_plan(plan_id):
             vote_type=VoteType(vote_type),
             is_veto=is_veto,
         ))
+        record_vote(plan_id, option_id, None, VoteType(vote_type))
+    bump_plan(plan_id)
     db.session.commit()
+    publish(plan_channel(plan_id), "votes", lambda: vote_tallies(plan_id))
     return jsonify({"message": "Voto registrado"}), 200
 
 
 @api.route('/plans/<int:plan_id>/votes', methods=['GET'])
 @jwt_required()
+@conditional("plan")
+@query_budget(3)
 def get_votes(plan_id):
-    votes   = Vote.query.filter_by(plan_id=plan_id).all()
-    summary = {"si": 0, "no": 0, "me_da_igual": 0}
-    for v in votes:
-        summary[v.vote_type.value] += 1
-    return jsonify({"votes": [v.serialize() for v in votes], "summary": summary}), 200
+    if wants_page(request.args):
+        votes, next_cursor = paginate(Vote.query.filter_by(plan_id=plan_id), Vote, request.args, newest_first=False)
+        return json_response({"votes": serialize_all(Vote, votes), "summary": vote_summary(plan_id),
+                              "next_cursor": next_cursor})
+    return json_response(votes_section(plan_id))
+
+
+def vote_summary(plan_id):
+    plan = db.session.get(Plan, plan_id)
+    return plan.vote_counts() if plan else {"si": 0, "no": 0, "me_da_igual": 0}
+
+
+def vote_tallies(plan_id):
+    options = PlanOption.query.filter_by(plan_id=plan_id).all()
+    return {"plan_id": plan_id, "summary": vote_summary(plan_id),
+            "options": [{"id": o.id, "vote_counts": o.vote_counts()} for o in options]}
+
+
+@api.route('/plans/<int:plan_id>/events', methods=['GET'])
+@jwt_required(locations=["headers", "query_string"])  # EventSource can't send headers: ?jwt=<token>
+def plan_events(plan_id):
+    db.get_or_404(Plan, plan_id)
+    # Subscribe before reading the snapshot so no vote can slip in between
+    subscription = subscribe(plan_channel(plan_id))
+    snapshot     = vote_tallies(plan_id)
+    # No stream_with_context: the stream never touches the database, so the
+    # request's session and pooled connection are released when this returns
+    return Response(event_stream(subscription, [("votes", snapshot)]), mimetype="text/event-stream",
+                    headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"})
 
 
 # ── Expenses ──────────────────────────────────────────────────────────────────
 
 @api.route('/plans/<int:plan_id>/expenses', methods=['GET'])
 @jwt_required()
+@query_budget(2)
 def get_expenses(plan_id):
-    return jsonify([e.serialize() for e in Expense.query.filter_by(plan_id=plan_id).all()]), 200
+    return list_response(expense_query(plan_id), Expense)
+
+
+def list_response(query, model):
+    if wants_page(request.args):
+        rows, next_cursor = paginate(query, model, request.args, newest_first=False)
+        return json_response({"items": serialize_all(model, rows), "next_cursor": next_cursor})
+    return json_response(serialize_all(model, query.all()))
 
 
 @api.route('/plans/<int:plan_id>/expenses', methods=['POST'])
 @jwt_required()
 def add_expense(plan_id):
-    user = User.query.get(int(get_jwt_identity()))
+    user = current_user()
     body = request.get_json()
     if not body or not body.get("description") or not body.get("total_amount"):
         raise APIException("description y total_amount son obligatorios", 400)
@@ -330,98 +418,180 @@ def add_expense(plan_id):
     db.session.flush()
 
     participants = body.get("participants") or [{"user_id": m.id} for m in plan.group.members]
-    total = float(body["total_amount"])
-    n     = len(participants)
-
-    for p in participants:
-        uid = p["user_id"]
-        if split_type == SplitType.IGUAL:
-            amount = round(total / n, 2)
-        elif split_type == SplitType.POR_PORCENTAJE:
-            amount = round(total * float(p.get("percentage", 100 / n)) / 100, 2)
-        elif split_type == SplitType.UNO_PAGA:
-            amount = 0 if uid == user.id else (round(total / (n - 1), 2) if n > 1 else 0)
-        else:
-            amount = float(p.get("amount", total / n))
-        db.session.add(ExpenseSplit(
-            expense_id=expense.id, user_id=uid, amount=amount,
-            is_paid=(uid == user.id)
-        ))
+    splits       = compute_splits(split_type, float(body["total_amount"]), participants, user.id)
+    db.session.add_all([ExpenseSplit(expense_id=expense.id, user_id=uid, amount=amount, is_paid=is_paid)
+                        for uid, amount, is_paid in splits])
+    record_expense(plan.group_id, user.id, splits)
+    bump_plan(plan_id)
     db.session.commit()
+    # Reload with splits and their users in two queries instead of one per split
+    expense = expense_query(plan_id).filter(Expense.id == expense.id).one()
     return jsonify(expense.serialize()), 201
 
 
+@api.route('/plans/<int:plan_id>/expenses/bulk', methods=['POST'])
+@jwt_required()
+def add_expenses_bulk(plan_id):
+    user = current_user()
+    plan = db.get_or_404(Plan, plan_id)
+    try:
+        ids, errors = import_expenses(plan, read_rows(request), user.id)
+    except ValueError as ex:
+        raise APIException(str(ex), 400)
+    return jsonify({"created": len(ids), "expense_ids": ids, "errors": errors}), 201 if ids else 400
+
+
 @api.route('/plans/<int:plan_id>/expenses/summary', methods=['GET'])
 @jwt_required()
+@query_budget(2)
 def expense_summary(plan_id):
-    expenses = Expense.query.filter_by(plan_id=plan_id).all()
-    balances = {}
-    for e in expenses:
-        balances.setdefault(e.paid_by_id, 0)
-        balances[e.paid_by_id] += e.total_amount
-        for s in e.splits:
-            balances.setdefault(s.user_id, 0)
-            balances[s.user_id] -= s.amount
-
-    debtors   = sorted([(uid, -b) for uid, b in balances.items() if b < -0.01], key=lambda x: -x[1])
-    creditors = sorted([(uid,  b) for uid, b in balances.items() if b >  0.01], key=lambda x: -x[1])
-    transactions, di, ci = [], 0, 0
-    while di < len(debtors) and ci < len(creditors):
-        did, debt   = debtors[di]
-        cid, credit = creditors[ci]
-        amt = min(debt, credit)
-        du  = User.query.get(did)
-        cu  = User.query.get(cid)
-        transactions.append({
-            "from_user_id": did, "from_username": du.username if du else str(did),
-            "to_user_id":   cid, "to_username":   cu.username if cu else str(cid),
-            "amount": round(amt, 2)
-        })
-        debtors[di]   = (did, debt   - amt)
-        creditors[ci] = (cid, credit - amt)
-        if debtors[di][1]   < 0.01: di += 1
-        if creditors[ci][1] < 0.01: ci += 1
-    return jsonify({"transactions": transactions}), 200
+    return jsonify(summary_section(plan_id)), 200
+
+
+def transfer_list(transfers, names=None):
+    if names is None:
+        names = usernames({uid for t in transfers for uid in t[:2]})
+    return [{
+        "from_user_id": did, "from_username": names.get(did, str(did)),
+        "to_user_id":   cid, "to_username":   names.get(cid, str(cid)),
+        "amount": amt,
+    } for did, cid, amt in transfers]
 
 
 @api.route('/expenses/<int:expense_id>/splits/<int:split_id>/pay', methods=['POST'])
 @jwt_required()
 def mark_paid(expense_id, split_id):
-    split         = db.get_or_404(ExpenseSplit, split_id)
-    split.is_paid = True
-    db.session.commit()
+    split = db.get_or_404(ExpenseSplit, split_id)
+    if not split.is_paid:
+        record_payment(split)
+        split.is_paid = True
+        bump_plan(split.expense.plan_id)
+        db.session.commit()
     return jsonify(split.serialize()), 200
 
 
+@api.route('/groups/<int:group_id>/ledger', methods=['GET'])
+@jwt_required()
+@query_budget(1)
+def group_ledger(group_id):
+    rows     = GroupBalance.query.options(*LOAD_PROFILES["group_ledger"]).filter_by(group_id=group_id).all()
+    balances = [r.serialize() for r in rows if abs(r.balance) >= 0.005]
+    names    = {r.user_id: r.user.username for r in rows}
+    return jsonify({"balances": balances,
+                    "transactions": transfer_list(settle({r.user_id: r.balance for r in rows}), names)}), 200
+
+
 # ── Memories ──────────────────────────────────────────────────────────────────
 
 @api.route('/plans/<int:plan_id>/memories', methods=['GET'])
 @jwt_required()
+@query_budget(1)
 def get_memories(plan_id):
-    return jsonify([m.serialize() for m in PlanMemory.query.filter_by(plan_id=plan_id).all()]), 200
+    return list_response(memory_query(plan_id), PlanMemory)
 
 
 @api.route('/plans/<int:plan_id>/memories', methods=['POST'])
 @jwt_required()
 def add_memory(plan_id):
-    user = User.query.get(int(get_jwt_identity()))
+    user = current_user()
     body = request.get_json()
     mem  = PlanMemory(plan_id=plan_id, user_id=user.id, phrase=body.get("phrase", ""))
     db.session.add(mem)
+    bump_plan(plan_id)
     db.session.commit()
     return jsonify(mem.serialize()), 201
 
 
+# ── Dashboard ─────────────────────────────────────────────────────────────────
+# One builder per section, shared with the single-resource endpoints above.
+# Each returns exactly what its endpoint returns (unpaginated).
+
+def options_section(plan_id):
+    return serialize_all(PlanOption, PlanOption.query.filter_by(plan_id=plan_id).all())
+
+
+def votes_section(plan_id):
+    return {"votes": serialize_all(Vote, Vote.query.filter_by(plan_id=plan_id).all()),
+            "summary": vote_summary(plan_id)}
+
+
+def expense_query(plan_id):
+    return Expense.query.options(*LOAD_PROFILES["expense_list"]).filter_by(plan_id=plan_id)
+
+
+def expenses_section(plan_id):
+    return serialize_all(Expense, expense_query(plan_id).all())
+
+
+def summary_section(plan_id, expenses=None):
+    if expenses is None:
+        return {"transactions": transfer_list(settle(plan_balances(plan_id)))}
+    # Expenses already serialized (dashboard): same balances and names, no extra queries
+    balances, names = {}, {}
+    for e in expenses:
+        balances[e["paid_by_id"]] = balances.get(e["paid_by_id"], 0) + e["total_amount"]
+        names[e["paid_by_id"]]    = e["paid_by_username"]
+        for sp in e["splits"]:
+            balances[sp["user_id"]] = balances.get(sp["user_id"], 0) - sp["amount"]
+            names[sp["user_id"]]    = sp["username"]
+    return {"transactions": transfer_list(settle(balances), names)}
+
+
+def memory_query(plan_id):
+    return PlanMemory.query.options(*LOAD_PROFILES["memory_list"]).filter_by(plan_id=plan_id)
+
+
+def memories_section(plan_id):
+    return serialize_all(PlanMemory, memory_query(plan_id).all())
+
+
+DASHBOARD_SECTIONS = ("plan", "options", "votes", "expenses", "summary", "memories")
+
+
+@api.route('/plans/<int:plan_id>/dashboard', methods=['GET'])
+@jwt_required()
+@conditional("plan")
+@query_budget(7)
+def plan_dashboard(plan_id):
+    include  = request.args.get("include")
+    sections = [s for s in include.split(",") if s] if include else DASHBOARD_SECTIONS
+    unknown  = set(sections) - set(DASHBOARD_SECTIONS)
+    if unknown:
+        raise APIException(f"Secciones desconocidas: {', '.join(sorted(unknown))}", 400)
+    # Loaded first in every case: 404s, and votes reads its counters from it
+    plan = db.get_or_404(Plan, plan_id, options=LOAD_PROFILES["plan_detail"])
+    data = {}
+    if "plan" in sections:
+        data["plan"] = plan.serialize()
+    if "options" in sections:
+        data["options"] = options_section(plan_id)
+    if "votes" in sections:
+        data["votes"] = votes_section(plan_id)
+    if "expenses" in sections or "summary" in sections:
+        expenses = expenses_section(plan_id)
+        if "expenses" in sections:
+            data["expenses"] = expenses
+        if "summary" in sections:
+            data["summary"] = summary_section(plan_id, expenses)
+    if "memories" in sections:
+        data["memories"] = memories_section(plan_id)
+    return json_response(data)
+
+
 # ── Hall of Fame ──────────────────────────────────────────────────────────────
 
 @api.route('/groups/<int:group_id>/hall-of-fame', methods=['GET'])
 @jwt_required()
+@query_budget(1)
 def hall_of_fame(group_id):
-    plans = (Plan.query.filter_by(group_id=group_id)
-             .filter(Plan.rating.isnot(None))
-             .order_by(Plan.rating.desc())
-             .limit(5).all())
-    return jsonify([p.serialize() for p in plans]), 200
+    return json_response(serialize_all(Plan, hall_of_fame_query(group_id).all()))
+
+
+@api.route('/groups/<int:group_id>/stats', methods=['GET'])
+@jwt_required()
+@query_budget(3)
+def get_group_stats(group_id):
+    return jsonify(group_stats(group_id)), 200
 
 
 # ── Events ────────────────────────────────────────────────────────────────────
@@ -451,26 +621,15 @@ def search_ticketmaster():
     if not key or key == "YOUR_KEY_HERE":
         return jsonify({"mock": True, "events": [{**e, "city": city} for e in MOCK_TM]}), 200
     try:
-        import requests as req
-        r = req.get("https://app.ticketmaster.com/discovery/v2/events.json",
-                    params={"apikey": key, "city": city,
-                            "keyword": request.args.get("keyword", ""), "size": 10}, timeout=10)
-        data   = r.json()
-        events = []
-        for e in data.get("_embedded", {}).get("events", []):
-            dates  = e.get("dates", {}).get("start", {})
-            venue  = e.get("_embedded", {}).get("venues", [{}])[0]
-            prices = e.get("priceRanges", [])
-            events.append({
-                "id": e.get("id"), "name": e.get("name"),
-                "date": dates.get("localDate"), "time": dates.get("localTime"),
-                "venue": venue.get("name"), "city": venue.get("city", {}).get("name"),
-                "category": e.get("classifications", [{}])[0].get("segment", {}).get("name", ""),
-                "image": e.get("images", [{}])[0].get("url", ""),
-                "url": e.get("url"),
-                "price_range": f"{prices[0].get('min','?')}€-{prices[0].get('max','?')}€" if prices else "Ver web",
-                "source": "ticketmaster",
-            })
-        return jsonify({"events": events}), 200
+        events, cache_state = event_search.search(key, city, request.args.get("keyword", ""))
     except Exception as ex:
-        raise APIException(str(ex), 500)
\ No newline at end of file
+        raise APIException(str(ex), 500)
+    response = jsonify({"events": events})
+    response.headers["X-Cache"] = cache_state
+    return response, 200
+
+
+@api.route('/events/ticketmaster/stats', methods=['GET'])
+@jwt_required()
+def ticketmaster_stats():
+    return jsonify(event_search.stats()), 200
@@ -0,0 +1,175 @@
+"""
+Synthetic dataset for load tests: flask seed --scale N --seed S.
+
+The same scale and seed always give the same rows and ids, with timestamps
+counted back from a fixed date rather than now, so benchmark runs can be
+compared. Each unit of scale is about 200 users and 40 groups with their
+plans, options, votes, expenses, splits and memories. Rows go in with
+executemany batches, or with COPY on Postgres with psycopg2. Every user
+shares one password hash (SEED_PASSWORD). The vote tallies, the group
+ledger and the group stats are rebuilt at the end.
+"""
+import enum
+import io
+import random
+from datetime import datetime, timedelta
+from sqlalchemy import text
+
+from api.models import (db, User, Group, Plan, PlanOption, Vote, Expense, ExpenseSplit,
+                        PlanMemory, PlanStatus, VoteType, SplitType, group_members)
+from api.expenses import compute_splits
+from api.passwords import hash_password
+from api.tallies import rebuild_tallies
+from api.ledger import rebuild_ledger
+from api.groupstats import rebuild_group_stats
+
+SEED_PASSWORD = "amigoplan"
+BATCH         = 5000
+EPOCH         = datetime(2026, 1, 1)
+
+NAMES      = ["marta", "dani", "lola", "juan", "ana", "pablo", "lucia", "sergio", "irene", "alex",
+              "nuria", "carlos", "elena", "jorge", "sara", "hugo", "paula", "diego", "clara", "ivan"]
+COLORS     = ["#FF6B35", "#6B4EFF", "#FF4081", "#00BCD4", "#4CAF50", "#FF9800"]
+EMOJIS     = ["🎉", "🔥", "🏔️", "🍕", "🎲", "🍻", "🎬", "⚽"]
+CATEGORIES = ["cena", "ocio", "aventura", "cultura", "deporte", "viaje"]
+PLACES     = ["Madrid", "Barcelona", "Valencia", "Sevilla", "Bilbao", "Granada", "Navacerrada"]
+PHRASES    = ["Lo repetimos seguro", "Qué risas", "El mejor plan del año", "Nunca más", "Épico"]
+STATUSES   = ([PlanStatus.PROPUESTA] * 15 + [PlanStatus.VOTACION] * 15 + [PlanStatus.CONFIRMADO] * 15
+              + [PlanStatus.EN_CURSO] * 5 + [PlanStatus.CERRADO] * 50)
+
+
+def seed(scale, seed=0):
+    """Insert the dataset into an empty database. Returns {table: rows}."""
+    rnd    = random.Random(seed)
+    counts = {}
+
+    def write(table, rows):
+        counts[table.name] = counts.get(table.name, 0) + write_rows(table, rows)
+
+    password = hash_password(SEED_PASSWORD)
+    n_users  = 200 * scale
+    write(User.__table__, [{
+        "id": uid, "email": f"{NAMES[uid % len(NAMES)]}{uid}@seed.amigoplan.dev",
+        "username": f"{NAMES[uid % len(NAMES)]}{uid}", "password": password, "is_active": True,
+        "avatar_color": rnd.choice(COLORS), "cancellations": min(int(rnd.expovariate(2)), 3),
+        "created_at": EPOCH - timedelta(days=rnd.uniform(365, 730)),
+    } for uid in range(1, n_users + 1)])
+
+    groups, members = [], {}
+    for gid in range(1, 40 * scale + 1):
+        size         = min(3 + int(rnd.paretovariate(1.3)), 25)
+        members[gid] = rnd.sample(range(1, n_users + 1), size)
+        groups.append({"id": gid, "name": f"Grupo {gid}", "description": "", "emoji": rnd.choice(EMOJIS),
+                       "admin_id": members[gid][0], "created_at": EPOCH - timedelta(days=rnd.uniform(0, 365))})
+    write(Group.__table__, groups)
+    write(group_members, [{"group_id": gid, "user_id": uid} for gid, uids in members.items() for uid in uids])
+
+    plans, options, votes, expenses, splits, memories = [], [], [], [], [], []
+    for group in groups:
+        gid, uids = group["id"], members[group["id"]]
+        for _ in range(min(int(rnd.expovariate(1 / 10)), 60)):
+            pid     = len(plans) + 1
+            status  = rnd.choice(STATUSES)
+            created = group["created_at"] + timedelta(days=rnd.uniform(0, 300))
+            closed  = status == PlanStatus.CERRADO
+            plans.append({
+                "id": pid, "title": f"{rnd.choice(CATEGORIES).capitalize()} #{pid}", "description": "",
+                "group_id": gid, "organizer_id": rnd.choice(uids), "admin_id": group["admin_id"],
+                "status": status, "category": rnd.choice(CATEGORIES), "location": rnd.choice(PLACES),
+                "scheduled_date": created + timedelta(days=rnd.randint(3, 40)),
+                "budget_level": rnd.choice(["$", "$$", "$$$"]), "energy_level": rnd.choice(["chill", "normal", "full"]),
+                "duration": "medio_dia", "is_surprise": rnd.random() < 0.05,
+                "rating": round(rnd.triangular(2, 5, 4), 1) if closed and rnd.random() < 0.7 else None,
+                "created_at": created, "closed_at": created + timedelta(days=rnd.randint(4, 45)) if closed else None,
+            })
+            plan_options = []
+            if status != PlanStatus.PROPUESTA and rnd.random() < 0.5:
+                for _ in range(rnd.randint(2, 4)):
+                    plan_options.append(len(options) + 1)
+                    options.append({"id": len(options) + 1, "plan_id": pid, "title": f"Opción {len(options) + 1}",
+                                    "description": "", "location": rnd.choice(PLACES),
+                                    "estimated_cost": round(rnd.uniform(5, 80), 2)})
+            for uid in uids:
+                if rnd.random() < 0.7:
+                    vote_type = rnd.choices(list(VoteType), weights=[60, 25, 15])[0]
+                    votes.append({"id": len(votes) + 1, "plan_id": pid, "option_id": None, "user_id": uid,
+                                  "vote_type": vote_type, "created_at": created + timedelta(hours=rnd.uniform(1, 72)),
+                                  "is_veto": vote_type == VoteType.NO and rnd.random() < 0.05})
+                if plan_options and rnd.random() < 0.5:
+                    votes.append({"id": len(votes) + 1, "plan_id": pid, "option_id": rnd.choice(plan_options),
+                                  "user_id": uid, "vote_type": VoteType.SI, "is_veto": False,
+                                  "created_at": created + timedelta(hours=rnd.uniform(1, 72))})
+            if status in (PlanStatus.EN_CURSO, PlanStatus.CERRADO):
+                for _ in range(rnd.randint(0, 4)):
+                    eid   = len(expenses) + 1
+                    payer = rnd.choice(uids)
+                    total = round(rnd.lognormvariate(3.2, 0.8), 2)
+                    expenses.append({"id": eid, "plan_id": pid, "description": f"Gasto {eid}", "total_amount": total,
+                                     "paid_by_id": payer, "split_type": SplitType.IGUAL,
+                                     "created_at": created + timedelta(days=rnd.uniform(1, 5))})
+                    for uid, amount, is_paid in compute_splits(SplitType.IGUAL, total,
+                                                               [{"user_id": u} for u in uids], payer):
+                        splits.append({"expense_id": eid, "user_id": uid, "amount": amount,
+                                       "is_paid": is_paid or (closed and rnd.random() < 0.4)})
+            if closed:
+                for _ in range(rnd.randint(0, 3)):
+                    memories.append({"id": len(memories) + 1, "plan_id": pid, "user_id": rnd.choice(uids),
+                                     "phrase": rnd.choice(PHRASES), "created_at": created + timedelta(days=rnd.uniform(5, 50))})
+
+    splits = [{"id": i, **row} for i, row in enumerate(splits, 1)]
+    for model, rows in ((Plan, plans), (PlanOption, options), (Vote, votes), (Expense, expenses),
+                        (ExpenseSplit, splits), (PlanMemory, memories)):
+        write(model.__table__, rows)
+    reset_sequences()
+    db.session.commit()
+    rebuild_tallies()
+    rebuild_ledger(fix=True)
+    rebuild_group_stats()
+    return counts
+
+
+def write_rows(table, rows):
+    # copy_expert() is psycopg2's; other drivers (psycopg 3 included) get executemany
+    if db.engine.dialect.name == "postgresql" and db.engine.dialect.driver == "psycopg2":
+        for start in range(0, len(rows), BATCH * 10):
+            copy_rows(table, rows[start:start + BATCH * 10])
+    else:
+        for start in range(0, len(rows), BATCH):
+            db.session.execute(table.insert(), rows[start:start + BATCH])
+    return len(rows)
+
+
+def copy_rows(table, rows):
+    if not rows:
+        return
+    columns = list(rows[0])
+    buffer  = io.StringIO()
+    for row in rows:
+        buffer.write("\t".join(copy_value(row[c]) for c in columns) + "\n")
+    buffer.seek(0)
+    cursor = db.session.connection().connection.cursor()
+    cursor.copy_expert(f'COPY "{table.name}" ({", ".join(columns)}) FROM STDIN', buffer)
+
+
+def copy_value(value):
+    # COPY text format: \N is NULL; backslash, tab and newlines are escaped
+    if value is None:
+        return "\\N"
+    if isinstance(value, bool):
+        return "t" if value else "f"
+    if isinstance(value, enum.Enum):
+        return value.name  # SQLAlchemy stores enum names, not values
+    if isinstance(value, datetime):
+        return value.isoformat(sep=" ")
+    return (str(value).replace("\\", "\\\\").replace("\t", "\\t")
+            .replace("\n", "\\n").replace("\r", "\\r"))
+
+
+def reset_sequences():
+    # Rows were inserted with explicit ids, so move each serial past them
+    if db.engine.dialect.name != "postgresql":
+        return
+    for model in (User, Group, Plan, PlanOption, Vote, Expense, ExpenseSplit, PlanMemory):
+        table = model.__table__.name
+        db.session.execute(text(f"SELECT setval(pg_get_serial_sequence('\"{table}\"', 'id'), "
+                                f"COALESCE((SELECT max(id) FROM \"{table}\"), 1))"))
@@ -0,0 +1,253 @@
+"""
+Schema-compiled JSON serialization for list endpoints.
+
+Each schema below lists the same fields as the model's serialize(). It is
+compiled once into a list of per-field accessors. Column types come from
+the mapper: DateTime is written with isoformat(), Enum with .value, and
+Float values are range-checked. json_response() encodes with orjson when
+it is installed. The bytes are identical to jsonify(): sorted keys,
+compact separators, non-ASCII escaped as \\uXXXX and a trailing newline.
+Anything orjson would write differently (floats that need an exponent or
+are not finite, huge ints) is encoded again with the stdlib encoder
+instead. Schema floats are checked as rows are serialized; floats
+elsewhere in a payload (summaries around the rows) are checked when it is
+encoded. stream_response() writes long lists in chunks straight from a
+server-side cursor.
+"""
+import os
+import re
+import time
+from itertools import islice
+from flask import current_app, jsonify, stream_with_context
+from sqlalchemy import inspect, DateTime, Enum, Float
+
+from api.metrics import add_serialize_time
+from api.models import (User, Plan, PlanOption, Vote, Expense, ExpenseSplit,
+                        PlanMemory, GroupBalance)
+
+try:
+    import orjson
+except ImportError:  # optional: stdlib json is used instead
+    orjson = None
+
+
+class Ref:
+    """key: related.attr, or None when the relationship is empty."""
+    def __init__(self, key, relationship, attr):
+        self.key, self.relationship, self.attr = key, relationship, attr
+
+
+class Many:
+    """key: [serialize(child) for child in obj.<key>], children of model."""
+    def __init__(self, key, model):
+        self.key, self.model = key, model
+
+
+class Computed:
+    """key: fn(obj)."""
+    def __init__(self, key, fn):
+        self.key, self.fn = key, fn
+
+
+class Serialized(list):
+    """Rows from serialize_all(): their floats went through _plain_float already."""
+
+
+class _StdlibFloat(float):
+    # orjson refuses float subclasses, which sends the payload to the stdlib encoder
+    pass
+
+
+def _plain_float(value):
+    # Between 1e-4 and 1e16 orjson and repr() write floats the same way;
+    # outside that range (and for nan/inf) only the stdlib matches jsonify.
+    if value is None or value == 0 or 1e-4 <= abs(value) < 1e16:
+        return value
+    return _StdlibFloat(value)
+
+
+SCHEMAS = {
+    User: ("id", "email", "username", "is_active", "avatar_color", "cancellations", "created_at",
+           Computed("avatar_initial", lambda u: u.username[0].upper() if u.username else "?")),
+    Plan: ("id", "title", "description", "group_id", "organizer_id", "admin_id", "status",
+           "category", "location", "scheduled_date", "budget_level", "energy_level", "duration",
+           "rating", "challenge_type", "is_surprise", "surprise_clue", "template",
+           "created_at", "closed_at",
+           Ref("organizer_username", "organizer", "username"),
+           Ref("admin_username", "admin_user", "username")),
+    PlanOption:   ("id", "plan_id", "title", "description", "location", "estimated_cost",
+                   Computed("vote_counts", PlanOption.vote_counts)),
+    Vote:         ("id", "plan_id", "option_id", "user_id", "vote_type", "is_veto"),
+    ExpenseSplit: ("id", "expense_id", "user_id", "amount", "is_paid",
+                   Ref("username", "user", "username")),
+    Expense:      ("id", "plan_id", "description", "total_amount", "paid_by_id", "split_type",
+                   "created_at", Ref("paid_by_username", "paid_by", "username"),
+                   Many("splits", ExpenseSplit)),
+    PlanMemory:   ("id", "plan_id", "user_id", "phrase", "created_at",
+                   Ref("username", "user", "username")),
+    GroupBalance: ("group_id", "user_id", Ref("username", "user", "username"),
+                   Computed("balance", lambda b: round(b.balance, 2))),
+}
+
+STREAM_CHUNK = int(os.getenv("JSON_STREAM_CHUNK", 500))
+ESCAPES      = re.compile(rb"\\(?:x([0-9a-f]{2})|U([0-9a-f]{8})|.)", re.S)
+
+_compiled = {}
+
+
+def serializer(model):
+    """The compiled serialize function for model (same dict as model.serialize())."""
+    fn = _compiled.get(model)
+    if fn is None:
+        fn = _compiled[model] = compile_schema(model, SCHEMAS[model])
+    return fn
+
+
+def compile_schema(model, fields):
+    """The serializer for model: plain columns copied as they are, then one accessor per other field."""
+    columns   = inspect(model).columns
+    plain     = [f for f in fields if isinstance(f, str) and not isinstance(columns[f].type, (Float, DateTime, Enum))]
+    accessors = [(_field_key(f), _field_getter(f, columns)) for f in fields if f not in plain]
+
+    def serialize(o):
+        # Loaded attributes live in the instance __dict__, which is much cheaper
+        # to read than the instrumented descriptors; anything expired or not
+        # loaded yet raises KeyError and goes through normal attribute access.
+        d = o.__dict__
+        try:
+            data = {key: d[key] for key in plain}
+        except KeyError:
+            data = {key: getattr(o, key) for key in plain}
+        for key, get in accessors:
+            data[key] = get(o, d)
+        return data
+
+    serialize.__name__ = f"serialize_{model.__name__.lower()}"
+    return serialize
+
+
+def _field_key(field):
+    return field if isinstance(field, str) else field.key
+
+
+def _field_getter(field, columns):
+    """get(obj, obj.__dict__) for one schema field."""
+    if isinstance(field, Computed):
+        fn = field.fn
+        return lambda o, d: fn(o)
+    if isinstance(field, Ref):
+        name, attr = field.relationship, field.attr
+
+        def get(o, d):
+            r = d[name] if name in d else getattr(o, name)
+            return getattr(r, attr) if r is not None else None
+        return get
+    if isinstance(field, Many):
+        name, child = field.key, serializer(field.model)
+        return lambda o, d: [child(x) for x in (d[name] if name in d else getattr(o, name))]
+    name, kind = field, type(columns[field].type)
+    if issubclass(kind, Float):
+        return lambda o, d: _plain_float(d[name] if name in d else getattr(o, name))
+    if issubclass(kind, DateTime):
+        return lambda o, d: v.isoformat() if (v := d[name] if name in d else getattr(o, name)) is not None else None
+    return lambda o, d: v.value if (v := d[name] if name in d else getattr(o, name)) is not None else None
+
+
+def _orjson_ready(data):
+    return (orjson is not None and getattr(current_app.json, "sort_keys", False)
+            and _floats_checked(data))
+
+
+def _floats_checked(data):
+    """False if data holds a float orjson may write differently from the stdlib."""
+    if isinstance(data, Serialized):
+        return True
+    if isinstance(data, float):
+        return type(data) is float and _plain_float(data) is data
+    if isinstance(data, dict):
+        return all(_floats_checked(v) for v in data.values())
+    if isinstance(data, (list, tuple)):
+        return all(_floats_checked(v) for v in data)
+    return True
+
+
+def _ascii_only(body):
+    """orjson's UTF-8 body escaped the way json.dumps(ensure_ascii=True) writes it."""
+    # Non-ASCII (and DEL) only ever appear inside JSON strings. backslashreplace
+    # writes \xNN, \uNNNN and \UNNNNNNNN; the first and last become JSON escapes.
+    body = body.replace(b"\x7f", b"\\u007f")
+    if body.isascii():
+        return body
+    return ESCAPES.sub(_json_escape, body.decode().encode("ascii", "backslashreplace"))
+
+
+def _json_escape(match):
+    byte, astral = match.groups()
+    if byte:
+        return b"\\u00" + byte
+    if astral:
+        n = int(astral, 16) - 0x10000
+        return b"\\u%04x\\u%04x" % (0xd800 | (n >> 10), 0xdc00 | (n & 0x3ff))
+    return match.group()  # an escape orjson wrote itself (\\, \", \n...)
+
+
+def _pretty():
+    compact = current_app.json.compact
+    return compact is False or (compact is None and current_app.debug)
+
+
+def dumps(data):
+    """data as compact JSON bytes, exactly as jsonify() writes it (no newline)."""
+    started = time.perf_counter()
+    body    = None
+    if _orjson_ready(data):
+        try:
+            body = orjson.dumps(data, option=orjson.OPT_SORT_KEYS)
+        except orjson.JSONEncodeError:
+            pass
+        else:
+            if getattr(current_app.json, "ensure_ascii", True):
+                body = _ascii_only(body)
+    if body is None:
+        body = current_app.json.dumps(data, separators=(",", ":")).encode()
+    add_serialize_time(time.perf_counter() - started)
+    return body
+
+
+def json_response(data, status=200):
+    """Response for data, byte-identical to jsonify(data)."""
+    if _pretty():
+        response = jsonify(data)
+    else:
+        response = current_app.response_class(dumps(data) + b"\n", mimetype=current_app.json.mimetype)
+    response.status_code = status
+    return response
+
+
+def stream_response(query, model, chunk_size=STREAM_CHUNK):
+    """JSON array of query's rows, streamed chunk_size rows at a time.
+
+    Rows come through yield_per (a server-side cursor on Postgres), so only
+    one chunk of ORM objects and dicts is alive at once. The bytes match
+    json_response() in compact mode. An error halfway through leaves the
+    client with a truncated array, because the status line has already been
+    sent.
+    """
+    fn = serializer(model)
+
+    def generate():
+        rows, prefix = iter(query.yield_per(chunk_size)), b"["
+        while chunk := list(islice(rows, chunk_size)):
+            yield prefix + dumps(Serialized(fn(row) for row in chunk))[1:-1]
+            prefix = b","
+        yield b"[]\n" if prefix == b"[" else b"]\n"
+
+    return current_app.response_class(stream_with_context(generate()), mimetype=current_app.json.mimetype)
+
+
+def serialize_all(model, rows):
+    started = time.perf_counter()
+    fn      = serializer(model)
+    data    = Serialized(fn(row) for row in rows)
+    add_serialize_time(time.perf_counter() - started)
+    return data
@@ -0,0 +1,47 @@
+"""
+Greedy settlement of net balances. Pure Python on purpose (no Flask, no DB)
+so it can be unit-tested and benchmarked on its own:
+
+    $ python src/api/settlement.py 5000
+"""
+import random
+import sys
+import time
+
+EPSILON = 0.01
+
+
+def settle(balances):
+    """Turn {user_id: net balance} into [(from_id, to_id, amount)] transfers.
+
+    Positive balances are owed money, negative ones owe it. Biggest debtors are
+    matched against biggest creditors, so there are at most n - 1 transfers.
+    """
+    debtors   = sorted([(uid, -b) for uid, b in balances.items() if b < -EPSILON], key=lambda x: -x[1])
+    creditors = sorted([(uid,  b) for uid, b in balances.items() if b >  EPSILON], key=lambda x: -x[1])
+    transfers, di, ci = [], 0, 0
+    while di < len(debtors) and ci < len(creditors):
+        did, debt   = debtors[di]
+        cid, credit = creditors[ci]
+        amt = min(debt, credit)
+        transfers.append((did, cid, round(amt, 2)))
+        debtors[di]   = (did, debt   - amt)
+        creditors[ci] = (cid, credit - amt)
+        if debtors[di][1]   < EPSILON: di += 1
+        if creditors[ci][1] < EPSILON: ci += 1
+    return transfers
+
+
+def random_balances(participants, seed=0):
+    rng      = random.Random(seed)
+    balances = {uid: round(rng.uniform(-500, 500), 2) for uid in range(1, participants)}
+    balances[participants] = -round(sum(balances.values()), 2)
+    return balances
+
+
+if __name__ == "__main__":
+    n        = int(sys.argv[1]) if len(sys.argv) > 1 else 1000
+    balances = random_balances(n)
+    start    = time.perf_counter()
+    result   = settle(balances)
+    print(f"{n} participantes -> {len(result)} transferencias en {(time.perf_counter() - start) * 1000:.2f} ms")
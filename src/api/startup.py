@@ -0,0 +1,66 @@
+"""
+What a worker sets up at import time, and what it leaves for later.
+
+Gunicorn workers only serve requests, so they skip everything the flask CLI
+needs: the commands (with seed, audit and the fake Ticketmaster) and
+Flask-Migrate, which pulls in Alembic. Both are registered only when the
+app is loaded by the flask command (FLASK_RUN_FROM_CLI, set by Flask).
+
+The admin UI is served by its own small Flask app, mounted at /admin and
+built on the first /admin request, so no worker introspects the models
+until someone opens it. API_ONLY=1 drops /admin entirely for workers that
+never serve it.
+
+bench/startup.py reports import times and time-to-first-request.
+"""
+import os
+import threading
+from flask import Flask
+from werkzeug.middleware.dispatcher import DispatcherMiddleware
+
+from api.models import db
+
+API_ONLY     = os.getenv("API_ONLY") == "1"
+RUN_FROM_CLI = os.getenv("FLASK_RUN_FROM_CLI") == "true"
+
+
+def setup_cli(app):
+    if not RUN_FROM_CLI:
+        return
+    from flask_migrate import Migrate
+    from api.commands import setup_commands
+    Migrate(app, db, compare_type=True)
+    setup_commands(app)
+
+
+def setup_lazy_admin(app):
+    if not API_ONLY:
+        app.wsgi_app = LazyAdmin(app, app.wsgi_app)
+
+
+class LazyAdmin:
+    """WSGI middleware: /admin goes to an admin app built on first use."""
+
+    def __init__(self, app, wsgi_app):
+        self.app        = app
+        self.wsgi_app   = wsgi_app
+        self.dispatcher = None
+        self._lock      = threading.Lock()
+
+    def __call__(self, environ, start_response):
+        path = environ.get("PATH_INFO", "")
+        if path != "/admin" and not path.startswith("/admin/"):
+            return self.wsgi_app(environ, start_response)
+        if self.dispatcher is None:
+            with self._lock:
+                if self.dispatcher is None:
+                    self.dispatcher = DispatcherMiddleware(self.wsgi_app, {"/admin": self.build()})
+        return self.dispatcher(environ, start_response)
+
+    def build(self):
+        from api.admin import setup_admin  # Flask-Admin is only imported here
+        admin_app = Flask(__name__)
+        admin_app.config.update(self.app.config)
+        db.init_app(admin_app)
+        setup_admin(admin_app, url='/')
+        return admin_app
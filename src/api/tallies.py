@@ -0,0 +1,60 @@
+from sqlalchemy import select, update, func
+
+from api.models import db, Plan, PlanOption, Vote, VoteType
+from api.etags import bump_plans
+
+TALLY_COLUMNS = {
+    VoteType.SI:          "votes_si",
+    VoteType.NO:          "votes_no",
+    VoteType.ME_DA_IGUAL: "votes_me_da_igual",
+}
+
+
+def record_vote(plan_id, option_id, old_type, new_type):
+    """Move one vote from old_type to new_type (None = no vote) on the plan and option tallies.
+
+    Runs as UPDATE ... SET col = col + 1 inside the caller's transaction, so
+    concurrent votes can't lose increments.
+    """
+    if old_type == new_type:
+        return
+    targets = [(Plan, plan_id)] + ([(PlanOption, option_id)] if option_id is not None else [])
+    for model, row_id in targets:
+        values = {}
+        if old_type is not None:
+            col = TALLY_COLUMNS[old_type]
+            values[col] = getattr(model, col) - 1
+        if new_type is not None:
+            col = TALLY_COLUMNS[new_type]
+            values[col] = getattr(model, col) + 1
+        db.session.execute(update(model).where(model.id == row_id).values(**values)
+                           .execution_options(synchronize_session=False))
+
+
+def rebuild_tallies():
+    """Recompute every tally from the vote table. Returns (plans, options) with votes.
+
+    Plans whose own or options' counters were off get a new version (ETag).
+    """
+    zero    = {col: 0 for col in TALLY_COLUMNS.values()}
+    touched = []
+    drifted = set()
+    for model, key, plan_id in ((Plan, Vote.plan_id, Plan.id), (PlanOption, Vote.option_id, PlanOption.plan_id)):
+        before = {row_id: (parent, tuple(counts)) for row_id, parent, *counts in db.session.execute(
+            select(model.id, plan_id, *(getattr(model, col) for col in TALLY_COLUMNS.values())))}
+        db.session.execute(update(model).values(**zero))
+        rows   = {}
+        counts = (db.session.query(key, Vote.vote_type, func.count())
+                  .filter(key.isnot(None)).group_by(key, Vote.vote_type))
+        for row_id, vote_type, n in counts:
+            rows.setdefault(row_id, {"id": row_id, **zero})[TALLY_COLUMNS[vote_type]] = n
+        if rows:
+            db.session.execute(update(model), list(rows.values()))
+        for row_id, (parent, old) in before.items():
+            new = rows.get(row_id, zero)
+            if old != tuple(new[col] for col in TALLY_COLUMNS.values()):
+                drifted.add(parent)
+        touched.append(len(rows))
+    bump_plans(drifted)
+    db.session.commit()
+    return tuple(touched)
@@ -0,0 +1,130 @@
+"""
+Ticketmaster event search with a pooled HTTP session and a TTL + LRU cache.
+
+Entries are fresh for TICKETMASTER_CACHE_TTL seconds. After that they are
+served stale for up to TICKETMASTER_CACHE_STALE seconds more, while a
+background thread refreshes them. Set TICKETMASTER_URL to point the client
+at a fake provider (see api.fake_ticketmaster).
+
+A cache miss fetches inside the request, so it gets a single attempt,
+bounded by TICKETMASTER_CONNECT_TIMEOUT + TICKETMASTER_TIMEOUT (read).
+Only the background refresh retries, with REFRESH_ATTEMPTS and backoff.
+"""
+import os
+import threading
+import time
+
+import requests
+from requests.adapters import HTTPAdapter
+
+from api.cache import TTLCache
+
+BASE_URL         = os.getenv("TICKETMASTER_URL", "https://app.ticketmaster.com/discovery/v2/events.json")
+CONNECT_TIMEOUT  = float(os.getenv("TICKETMASTER_CONNECT_TIMEOUT", 1.5))
+TIMEOUT          = float(os.getenv("TICKETMASTER_TIMEOUT", 3))  # read
+REFRESH_ATTEMPTS = 3
+CACHE_TTL        = float(os.getenv("TICKETMASTER_CACHE_TTL", 600))
+CACHE_STALE      = float(os.getenv("TICKETMASTER_CACHE_STALE", 3600))
+CACHE_SIZE       = int(os.getenv("TICKETMASTER_CACHE_SIZE", 512))
+
+
+class EventSearch:
+
+    def __init__(self, base_url=BASE_URL, timeout=(CONNECT_TIMEOUT, TIMEOUT), cache=None):
+        self.base_url    = base_url
+        self.timeout     = timeout
+        self.cache       = cache if cache is not None else TTLCache(CACHE_SIZE, CACHE_TTL, CACHE_STALE)
+        self.metrics     = {"hits": 0, "stale_hits": 0, "misses": 0, "refreshes": 0, "errors": 0}
+        self._refreshing = set()
+        self._lock       = threading.Lock()
+        self._session    = None
+
+    @property
+    def session(self):
+        # One keep-alive connection pool per process, created on first use
+        if self._session is None:
+            session = requests.Session()
+            adapter = HTTPAdapter(pool_connections=4, pool_maxsize=16)  # no retries: see _fetch
+            session.mount("http://", adapter)
+            session.mount("https://", adapter)
+            self._session = session
+        return self._session
+
+    def _count(self, metric):
+        with self._lock:
+            self.metrics[metric] += 1
+
+    def search(self, api_key, city, keyword=""):
+        """Return (events, cache state) where state is "hit", "stale" or "miss"."""
+        key           = (city.strip().lower(), keyword.strip().lower())
+        events, state = self.cache.get(key)
+        if state == "fresh":
+            self._count("hits")
+            return events, "hit"
+        if state == "stale":
+            self._count("stale_hits")
+            self._refresh_in_background(key, api_key)
+            return events, "stale"
+        self._count("misses")
+        events = self._fetch(key, api_key)
+        self.cache.set(key, events)
+        return events, "miss"
+
+    def _fetch(self, key, api_key, attempts=1):
+        city, keyword = key
+        for attempt in range(attempts):
+            try:
+                r = self.session.get(self.base_url, timeout=self.timeout,
+                                     params={"apikey": api_key, "city": city, "keyword": keyword, "size": 10})
+                r.raise_for_status()
+                return parse_events(r.json())
+            except Exception as ex:
+                if attempt + 1 < attempts and isinstance(ex, requests.RequestException):
+                    time.sleep(0.2 * 2 ** attempt)
+                    continue
+                self._count("errors")
+                raise
+
+    def _refresh_in_background(self, key, api_key):
+        with self._lock:
+            if key in self._refreshing:
+                return
+            self._refreshing.add(key)
+
+        def refresh():
+            try:
+                self.cache.set(key, self._fetch(key, api_key, attempts=REFRESH_ATTEMPTS))
+                self._count("refreshes")
+            except Exception:
+                pass  # keep serving the stale entry until it expires
+            finally:
+                with self._lock:
+                    self._refreshing.discard(key)
+
+        threading.Thread(target=refresh, daemon=True).start()
+
+    def stats(self):
+        with self._lock:
+            return {**self.metrics, "size": len(self.cache)}
+
+
+def parse_events(data):
+    events = []
+    for e in data.get("_embedded", {}).get("events", []):
+        dates  = e.get("dates", {}).get("start", {})
+        venue  = e.get("_embedded", {}).get("venues", [{}])[0]
+        prices = e.get("priceRanges", [])
+        events.append({
+            "id": e.get("id"), "name": e.get("name"),
+            "date": dates.get("localDate"), "time": dates.get("localTime"),
+            "venue": venue.get("name"), "city": venue.get("city", {}).get("name"),
+            "category": e.get("classifications", [{}])[0].get("segment", {}).get("name", ""),
+            "image": e.get("images", [{}])[0].get("url", ""),
+            "url": e.get("url"),
+            "price_range": f"{prices[0].get('min','?')}€-{prices[0].get('max','?')}€" if prices else "Ver web",
+            "source": "ticketmaster",
+        })
+    return events
+
+
+event_search = EventSearch()
@@ -0,0 +1,162 @@
+"""
+Username autocomplete for /users/search.
+
+Results are ranked exact match, then prefix, then substring (substring only
+for queries of 3+ characters), shortest names first within each tier.
+
+On Postgres the ranking runs in SQL on lower(username), backed by a
+text_pattern_ops btree (prefix) and a pg_trgm GIN index (substring). Other
+databases use an in-process index: a sorted list of lowercased names for
+prefixes plus one NUL-joined string scanned with str.find for substrings.
+It is rebuilt every USERNAME_INDEX_TTL seconds, and users created by this
+process are added to it right away.
+"""
+import bisect
+import os
+import threading
+import time
+from sqlalchemy import select, func, case, event, inspect
+from sqlalchemy.orm import Session, aliased
+
+from api.models import db, User, group_members
+
+USERNAME_INDEX_TTL = float(os.getenv("USERNAME_INDEX_TTL", 300))
+SUBSTRING_MIN      = 3
+CANDIDATE_CAP      = 2000
+
+
+def escape_like(text):
+    return text.replace("\\", "\\\\").replace("%", "\\%").replace("_", "\\_")
+
+
+def shared_group_user_ids(user_id):
+    mine   = aliased(group_members)
+    theirs = aliased(group_members)
+    return (select(theirs.c.user_id).distinct()
+            .join(mine, mine.c.group_id == theirs.c.group_id)
+            .where(mine.c.user_id == user_id))
+
+
+def sql_search_query(q, limit, scope_user_id=None):
+    lowered = func.lower(User.username)
+    pattern = escape_like(q)
+    prefix  = lowered.like(pattern + "%", escape="\\")
+    match   = lowered.like(f"%{pattern}%", escape="\\") if len(q) >= SUBSTRING_MIN else prefix
+    query   = User.query.filter(match)
+    if scope_user_id is not None:
+        query = query.filter(User.id.in_(shared_group_user_ids(scope_user_id)))
+    return (query.order_by(case((lowered == q, 0), (prefix, 1), else_=2),
+                           func.length(User.username), lowered)
+            .limit(limit))
+
+
+class UsernameIndex:
+
+    def __init__(self, ttl=USERNAME_INDEX_TTL):
+        self.ttl      = ttl
+        self._lock    = threading.Lock()
+        self._built   = None
+        self._names   = []   # sorted lowercased usernames
+        self._ids     = []   # user id for each entry of _names
+        self._blob    = ""   # "\0".join(_names), for substring scans
+        self._offsets = []   # start of each name inside _blob
+        self._pending = []   # (lowered, id) created since the last build
+
+    def _ensure(self):
+        with self._lock:
+            if self._built is not None and time.monotonic() - self._built < self.ttl:
+                return
+            rows  = sorted((name.lower(), uid) for uid, name in db.session.execute(select(User.id, User.username)))
+            names = [name for name, _ in rows]
+            offsets, pos = [], 0
+            for name in names:
+                offsets.append(pos)
+                pos += len(name) + 1
+            self._names   = names
+            self._ids     = [uid for _, uid in rows]
+            self._blob    = "\0".join(names)
+            self._offsets = offsets
+            self._pending = []
+            self._built   = time.monotonic()
+
+    def add(self, user_id, username):
+        with self._lock:
+            self._pending.append((username.lower(), user_id))
+
+    def invalidate(self):
+        with self._lock:
+            self._built = None
+
+    def search(self, q, limit, allowed=None):
+        """Ranked user ids for q (already lowercased); allowed optionally restricts ids."""
+        self._ensure()
+        with self._lock:  # one build's names, ids, blob and offsets, never a mix of two
+            names, ids, blob, offsets, pending = (self._names, self._ids, self._blob, self._offsets,
+                                                  list(self._pending))
+        ok = (lambda uid: True) if allowed is None else allowed.__contains__
+
+        exact, prefix, seen = [], [], set()
+        i = bisect.bisect_left(names, q)
+        while i < len(names) and names[i].startswith(q) and len(prefix) < CANDIDATE_CAP:
+            if ok(ids[i]):
+                (exact if names[i] == q else prefix).append((len(names[i]), names[i], ids[i]))
+                seen.add(ids[i])
+            i += 1
+        substring = []
+        if len(q) >= SUBSTRING_MIN and len(exact) + len(prefix) < limit:
+            pos = blob.find(q)
+            while pos != -1 and len(substring) < CANDIDATE_CAP:
+                j = bisect.bisect_right(offsets, pos) - 1
+                if ids[j] not in seen and ok(ids[j]):
+                    substring.append((len(names[j]), names[j], ids[j]))
+                    seen.add(ids[j])
+                pos = blob.find(q, offsets[j] + len(names[j]) + 1)
+        for name, uid in pending:
+            if uid in seen or not ok(uid) or q not in name:
+                continue
+            if name == q:
+                exact.append((len(name), name, uid))
+            elif name.startswith(q):
+                prefix.append((len(name), name, uid))
+            elif len(q) >= SUBSTRING_MIN:
+                substring.append((len(name), name, uid))
+        ranked = sorted(exact) + sorted(prefix) + sorted(substring)
+        return [uid for _, _, uid in ranked[:limit]]
+
+
+username_index = UsernameIndex()
+
+
+def autocomplete_users(q, limit=10, scope_user_id=None):
+    q = q.strip().lower()
+    if db.engine.dialect.name == "postgresql":
+        return sql_search_query(q, limit, scope_user_id).all()
+    allowed = None
+    if scope_user_id is not None:
+        allowed = set(db.session.scalars(shared_group_user_ids(scope_user_id)))
+    ids   = username_index.search(q, limit, allowed)
+    users = {u.id: u for u in User.query.filter(User.id.in_(ids))} if ids else {}
+    return [users[uid] for uid in ids if uid in users]
+
+
+@event.listens_for(Session, "after_commit")
+def _index_new_users(session):
+    for user_id, username in session.info.pop("new_usernames", ()):
+        username_index.add(user_id, username)
+    if session.info.pop("renamed_users", False):
+        username_index.invalidate()
+
+
+@event.listens_for(Session, "after_flush")
+def _collect_new_users(session, flush_context):
+    session.info.setdefault("new_usernames", []).extend(
+        (obj.id, obj.username) for obj in session.new if isinstance(obj, User))
+    if any(isinstance(obj, User) and inspect(obj).attrs.username.history.has_changes()
+           for obj in session.dirty):
+        session.info["renamed_users"] = True
+
+
+@event.listens_for(Session, "after_rollback")
+def _forget_new_users(session):
+    session.info.pop("new_usernames", None)
+    session.info.pop("renamed_users", None)
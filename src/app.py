@@ -2,18 +2,22 @@
 This module takes care of starting the API Server, Loading the DB and Adding the endpoints
 """
 import os
-from flask import Flask, request, jsonify, url_for, send_from_directory
-from flask_migrate import Migrate
-from flask_swagger import swagger
+from flask import Flask, request, jsonify, url_for
 from flask_jwt_extended import JWTManager
+from sqlalchemy import text
+from sqlalchemy.exc import SQLAlchemyError
 from api.utils import APIException, generate_sitemap
 from api.models import db
 from api.routes import api
-from api.admin import setup_admin
-from api.commands import setup_commands
+from api.auth import setup_auth
+from api.metrics import setup_metrics
+from api.nplusone import setup_nplusone
+from api.startup import setup_cli, setup_lazy_admin
+from api.assets import AssetManifest
 
 ENV = "development" if os.getenv("FLASK_DEBUG") == "1" else "production"
 static_file_dir = os.path.join(os.path.dirname(os.path.realpath(__file__)), '../dist/')
+static_assets   = AssetManifest(static_file_dir)
 
 app = Flask(__name__)
 app.url_map.strict_slashes = False
@@ -26,16 +30,28 @@ else:
     app.config['SQLALCHEMY_DATABASE_URI'] = "sqlite:////tmp/test.db"
 
 app.config['SQLALCHEMY_TRACK_MODIFICATIONS'] = False
+if not app.config['SQLALCHEMY_DATABASE_URI'].startswith("sqlite"):
+    # One connection per worker thread (DB_POOL_SIZE, set by gunicorn.conf.py),
+    # checked before use and replaced before the server's idle timeout
+    app.config['SQLALCHEMY_ENGINE_OPTIONS'] = {
+        "pool_size":     int(os.getenv("DB_POOL_SIZE", 5)),
+        "max_overflow":  int(os.getenv("DB_MAX_OVERFLOW", 2)),
+        "pool_timeout":  10,
+        "pool_recycle":  int(os.getenv("DB_POOL_RECYCLE", 1800)),
+        "pool_pre_ping": True,
+    }
 
 # JWT
 app.config['JWT_SECRET_KEY'] = os.getenv("FLASK_APP_KEY", "amigoplan-secret-key")
 jwt = JWTManager(app)
 
-MIGRATE = Migrate(app, db, compare_type=True)
 db.init_app(app)
 
-setup_admin(app)
-setup_commands(app)
+setup_lazy_admin(app)
+setup_cli(app)
+setup_metrics(app)
+setup_nplusone(app)
+setup_auth(app)
 
 app.register_blueprint(api, url_prefix='/api')
 
@@ -45,20 +61,31 @@ def handle_invalid_usage(error):
     return jsonify(error.to_dict()), error.status_code
 
 
+@app.route('/healthz')
+def healthz():
+    return jsonify({"status": "ok"}), 200
+
+
+@app.route('/readyz')
+def readyz():
+    try:
+        db.session.execute(text("SELECT 1"))
+    except SQLAlchemyError:
+        app.logger.warning("readyz: database unavailable", exc_info=True)
+        return jsonify({"status": "unavailable"}), 503
+    return jsonify({"status": "ok"}), 200
+
+
 @app.route('/')
 def sitemap():
     if ENV == "development":
         return generate_sitemap(app)
-    return send_from_directory(static_file_dir, 'index.html')
+    return static_assets.serve('index.html')
 
 
 @app.route('/<path:path>', methods=['GET'])
 def serve_any_other_file(path):
-    if not os.path.isfile(os.path.join(static_file_dir, path)):
-        path = 'index.html'
-    response = send_from_directory(static_file_dir, path)
-    response.cache_control.max_age = 0
-    return response
+    return static_assets.serve(path)
 
 
 if __name__ == '__main__':
@@ -0,0 +1,83 @@
+"""
+Shared fixtures: the real app on an in-memory SQLite database, a fresh
+schema per test, and a counter for the SQL statements a request runs.
+
+    $ pip install pytest && python -m pytest -q
+"""
+import os
+import sys
+from contextlib import contextmanager
+
+os.environ["DATABASE_URL"] = "sqlite://"
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), "..", "src"))
+
+import pytest  # noqa: E402
+from flask_jwt_extended import create_access_token  # noqa: E402
+from sqlalchemy import event  # noqa: E402
+
+from app import app as flask_app  # noqa: E402
+from api.models import db, User, Group, Plan, PlanStatus  # noqa: E402
+from api.auth import user_cache  # noqa: E402
+from api.usersearch import username_index  # noqa: E402
+from api.groupstats import rebuild_group_stats  # noqa: E402
+
+
+@pytest.fixture
+def app():
+    flask_app.testing = True
+    with flask_app.app_context():
+        db.create_all()
+        user_cache.clear()
+        username_index.invalidate()
+        yield flask_app
+        db.session.remove()
+        db.drop_all()
+
+
+@pytest.fixture
+def client(app):
+    return app.test_client()
+
+
+@pytest.fixture
+def count_queries(app):
+    """with count_queries() as queries: ... -> queries is the list of statements run."""
+
+    @contextmanager
+    def counter():
+        statements = []
+
+        def record(conn, cursor, statement, parameters, context, executemany):
+            statements.append(statement)
+
+        event.listen(db.engine, "before_cursor_execute", record)
+        try:
+            yield statements
+        finally:
+            event.remove(db.engine, "before_cursor_execute", record)
+
+    return counter
+
+
+def auth(user_id):
+    return {"Authorization": f"Bearer {create_access_token(identity=str(user_id))}"}
+
+
+@pytest.fixture
+def group(app):
+    """A group of four members with a dozen plans, rated and unrated, from different organizers."""
+    users = [User(email=f"u{i}@test.com", username=f"user{i}", password="x", is_active=True) for i in range(4)]
+    db.session.add_all(users)
+    db.session.flush()
+    group = Group(name="La Pandilla", admin_id=users[0].id)
+    group.members.extend(users)
+    db.session.add(group)
+    db.session.flush()
+    statuses = list(PlanStatus)
+    db.session.add_all([Plan(title=f"Plan {i}", group_id=group.id, admin_id=users[0].id,
+                             organizer_id=users[i % 4].id, status=statuses[i % len(statuses)],
+                             category=("cena", "ocio", "viaje")[i % 3], rating=(3.0 + i % 3) if i % 2 else None)
+                        for i in range(12)])
+    db.session.commit()
+    rebuild_group_stats()
+    return group
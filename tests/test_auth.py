@@ -0,0 +1,34 @@
+"""current_user(): one identity per request, served from the user cache when it can."""
+from sqlalchemy import update
+
+from api.models import db, User
+
+from conftest import auth
+
+
+def test_each_request_gets_its_own_user(client, group):
+    for user_id in [member.id for member in group.members]:
+        assert client.get("/api/auth/me", headers=auth(user_id)).get_json()["id"] == user_id
+
+
+def test_cached_user_needs_no_select(client, group, count_queries):
+    headers = auth(group.admin_id)
+    assert client.get("/api/auth/me", headers=headers).status_code == 200
+    db.session.remove()
+    with count_queries() as queries:
+        assert client.get("/api/auth/me", headers=headers).status_code == 200
+    assert queries == []
+
+
+def test_flush_and_bulk_update_evict(client, group):
+    user_id, headers = group.admin_id, auth(group.admin_id)
+    client.get("/api/auth/me", headers=headers)
+    db.session.get(User, user_id).username = "renombrado"
+    db.session.commit()
+    db.session.remove()
+    assert client.get("/api/auth/me", headers=headers).get_json()["username"] == "renombrado"
+
+    db.session.execute(update(User).where(User.id == user_id).values(username="en_bloque"))
+    db.session.commit()
+    db.session.remove()
+    assert client.get("/api/auth/me", headers=headers).get_json()["username"] == "en_bloque"
@@ -0,0 +1,51 @@
+"""Conditional GETs: 304 while nothing changed, a new ETag once something embedded did."""
+from sqlalchemy import update
+
+from api.models import db, Plan, GroupBalance
+from api.tallies import rebuild_tallies
+from api.ledger import rebuild_ledger
+
+from conftest import auth
+
+
+def etag_after(client, url, headers, etag):
+    """The response's ETag, checking that the previous one is now stale."""
+    response = client.get(url, headers={**headers, "If-None-Match": etag})
+    assert response.status_code == 200, url
+    assert response.headers["ETag"] != etag
+    return response.headers["ETag"]
+
+
+def test_plan_etag(client, group):
+    plan_id, admin_id = group.plans[0].id, group.admin_id
+    headers = auth(admin_id)
+    url     = f"/api/plans/{plan_id}/dashboard"
+    etag    = client.get(url, headers=headers).headers["ETag"]
+    assert client.get(url, headers={**headers, "If-None-Match": etag}).status_code == 304
+
+    client.post(f"/api/plans/{plan_id}/vote", headers=headers, json={"vote_type": "si"})
+    etag = etag_after(client, url, headers, etag)
+
+    expense = client.post(f"/api/plans/{plan_id}/expenses", headers=headers,
+                          json={"description": "Cena", "total_amount": 40}).get_json()
+    etag    = etag_after(client, url, headers, etag)
+    split   = next(s for s in expense["splits"] if s["user_id"] != admin_id)
+    client.post(f"/api/expenses/{expense['id']}/splits/{split['id']}/pay", headers=headers)
+    etag    = etag_after(client, url, headers, etag)
+
+    rebuild_tallies()  # counters already right: nothing to invalidate
+    assert client.get(url, headers={**headers, "If-None-Match": etag}).status_code == 304
+    db.session.execute(update(Plan).where(Plan.id == plan_id).values(votes_si=7))
+    db.session.commit()
+    rebuild_tallies()
+    etag_after(client, url, headers, etag)
+
+
+def test_group_etag_after_ledger_rebuild(client, group):
+    group_id, headers = group.id, auth(group.admin_id)
+    url  = f"/api/groups/{group_id}"
+    etag = client.get(url, headers=headers).headers["ETag"]
+    db.session.add(GroupBalance(group_id=group_id, user_id=group.admin_id, balance=12.5))
+    db.session.commit()
+    assert rebuild_ledger(fix=True) == [(group_id, group.admin_id)]
+    etag_after(client, url, headers, etag)
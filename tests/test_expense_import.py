@@ -0,0 +1,19 @@
+"""Bulk expense import reports bad rows instead of failing the whole request."""
+from conftest import auth
+
+
+def test_malformed_split_is_a_row_error(client, group):
+    plan_id, headers = group.plans[0].id, auth(group.admin_id)
+    members = [member.id for member in group.members]
+    rows = [
+        {"description": "Cena", "total_amount": 40},
+        {"description": "Entradas", "total_amount": 30, "split_type": "por_porcentaje",
+         "participants": [{"user_id": members[0], "percentage": "mitad"}, {"user_id": members[1], "percentage": 50}]},
+        {"description": "Taxi", "total_amount": 12, "split_type": "por_items",
+         "participants": [{"user_id": members[0], "amount": None}]},
+    ]
+    response = client.post(f"/api/plans/{plan_id}/expenses/bulk", headers=headers, json=rows)
+    assert response.status_code == 201
+    body = response.get_json()
+    assert body["created"] == 1
+    assert [error["row"] for error in body["errors"]] == [1, 2]
@@ -0,0 +1,45 @@
+"""The incrementally kept group stats match a rebuild from the plan table."""
+from sqlalchemy import select
+
+from api.models import db, GroupHallOfFame
+from api.groupstats import group_stats, rebuild_group_stats
+
+from conftest import auth
+
+
+def snapshot(group_id):
+    hall = db.session.execute(select(GroupHallOfFame.plan_id, GroupHallOfFame.rating)
+                              .where(GroupHallOfFame.group_id == group_id)
+                              .order_by(GroupHallOfFame.rating.desc(), GroupHallOfFame.plan_id)).all()
+    return group_stats(group_id), [tuple(row) for row in hall]
+
+
+def test_plan_changes_match_a_rebuild(client, group):
+    group_id = group.id
+    users    = [member.id for member in group.members]
+    plan_ids = [plan.id for plan in group.plans]
+
+    for i, user_id in enumerate(users):
+        response = client.post("/api/plans", headers=auth(user_id),
+                               json={"title": f"Nuevo {i}", "group_id": group_id, "category": ("cine", "cena")[i % 2]})
+        assert response.status_code == 201
+        plan_ids.append(response.get_json()["id"])
+
+    headers = auth(group.admin_id)
+    changes = [
+        (plan_ids[0], {"rating": 5}),                      # unrated into the Hall of Fame
+        (plan_ids[1], {"rating": 1}),                      # drops out of it
+        (plan_ids[3], {"category": "viaje", "rating": 4.5}),
+        (plan_ids[5], {"status": "cerrado"}),
+        (plan_ids[12], {"category": "ocio", "status": "votacion", "rating": 4}),
+        (plan_ids[13], {"title": "Solo el título"}),
+    ]
+    for plan_id, body in changes:
+        assert client.put(f"/api/plans/{plan_id}", headers=headers, json=body).status_code == 200
+    for plan_id in (plan_ids[2], plan_ids[12], plan_ids[14], plan_ids[14], plan_ids[4]):
+        assert client.post(f"/api/plans/{plan_id}/advance", headers=headers).status_code == 200
+
+    incremental = snapshot(group_id)
+    assert incremental[0]["plans"] == 16
+    rebuild_group_stats()
+    assert snapshot(group_id) == incremental
@@ -0,0 +1,13 @@
+"""Group summaries embed a member preview and an exact member count."""
+from conftest import auth
+
+
+def test_member_limit_keeps_the_count_exact(client, group):
+    group_id, headers = group.id, auth(group.admin_id)
+    for limit, preview in ((2, 2), (0, 1), (-3, 1), (None, 4)):
+        query  = "" if limit is None else f"?member_limit={limit}"
+        listed = client.get(f"/api/groups{query}", headers=headers).get_json()[0]
+        detail = client.get(f"/api/groups/{group_id}{query}", headers=headers).get_json()
+        for body in (listed, detail):
+            assert body["member_count"] == 4, limit
+            assert len(body["members"]) == preview, limit
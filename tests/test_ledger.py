@@ -0,0 +1,36 @@
+"""The running group balances match a rebuild from the expenses after every kind of change."""
+from sqlalchemy import select
+
+from api.models import db, GroupBalance
+from api.ledger import rebuild_ledger
+
+from conftest import auth
+
+
+def test_balances_match_a_rebuild(client, group):
+    plan_id = group.plans[0].id
+    users   = [member.id for member in group.members]
+
+    created = [client.post(f"/api/plans/{plan_id}/expenses", headers=auth(payer), json=body).get_json()
+               for payer, body in ((users[0], {"description": "Cena", "total_amount": 80}),
+                                   (users[1], {"description": "Taxi", "total_amount": 21.5,
+                                               "participants": [{"user_id": u} for u in users[:3]]}),
+                                   (users[2], {"description": "Entradas", "total_amount": 60,
+                                               "split_type": "por_porcentaje",
+                                               "participants": [{"user_id": users[0], "percentage": 70},
+                                                                {"user_id": users[3], "percentage": 30}]}))]
+    assert all(expense["id"] for expense in created)
+
+    for expense in created[:2]:
+        split = next(s for s in expense["splits"] if s["user_id"] != expense["paid_by_id"])
+        response = client.post(f"/api/expenses/{expense['id']}/splits/{split['id']}/pay", headers=auth(split["user_id"]))
+        assert response.json["is_paid"]
+
+    rows = [{"description": f"Súper {i}", "total_amount": 10 + i, "paid_by_id": users[i % 4]} for i in range(6)]
+    assert client.post(f"/api/plans/{plan_id}/expenses/bulk", headers=auth(users[3]), json=rows).json["created"] == 6
+
+    balances = dict(db.session.execute(select(GroupBalance.user_id, GroupBalance.balance)
+                                       .where(GroupBalance.group_id == group.id)).all())
+    assert any(abs(balance) > 1 for balance in balances.values())
+    assert abs(sum(balances.values())) < 0.05
+    assert rebuild_ledger(fix=False) == []
@@ -0,0 +1,56 @@
+"""Keyset pages cover the whole list exactly once, even when many rows share created_at."""
+from datetime import datetime
+
+from api.models import db, Plan, Expense
+
+from conftest import auth
+
+INSTANTS = [datetime(2026, 5, 1, 20, 0), datetime(2026, 5, 1, 20, 0, 0, 500), datetime(2026, 5, 2, 9, 30)]
+
+
+def pages(client, url, headers, limit):
+    """Every row id in page order, and the number of pages."""
+    ids, cursor, count = [], None, 0
+    while True:
+        query    = {"limit": limit, **({"cursor": cursor} if cursor else {})}
+        response = client.get(url, headers=headers, query_string=query)
+        assert response.status_code == 200
+        body   = response.get_json()
+        ids   += [row["id"] for row in body["items"]]
+        cursor = body["next_cursor"]
+        count += 1
+        if cursor is None:
+            return ids, count
+        assert len(set(ids)) == len(ids), "a row came back on a later page"
+
+
+def test_plan_pages_have_no_gaps_or_duplicates(client, group):
+    group_id, admin_id = group.id, group.admin_id
+    db.session.add_all([Plan(title=f"Empate {i}", group_id=group_id, admin_id=admin_id,
+                             created_at=INSTANTS[i % len(INSTANTS)]) for i in range(40)])
+    db.session.commit()
+    expected = [plan.id for plan in sorted(Plan.query.filter_by(group_id=group_id),
+                                           key=lambda p: (p.created_at, p.id), reverse=True)]
+    db.session.remove()
+
+    for limit in (1, 7, 13, len(expected)):
+        ids, count = pages(client, f"/api/groups/{group_id}/plans", auth(admin_id), limit)
+        assert ids == expected, limit
+        assert count == -(-len(expected) // limit)
+
+
+def test_expense_pages_run_oldest_first(client, group):
+    plan_id, admin_id = group.plans[0].id, group.admin_id
+    db.session.add_all([Expense(plan_id=plan_id, description=f"Ronda {i}", total_amount=10, paid_by_id=admin_id,
+                                created_at=INSTANTS[i % 2]) for i in range(25)])
+    db.session.commit()
+    expected = [e.id for e in sorted(Expense.query.filter_by(plan_id=plan_id), key=lambda e: (e.created_at, e.id))]
+    db.session.remove()
+
+    ids, _ = pages(client, f"/api/plans/{plan_id}/expenses", auth(admin_id), 4)
+    assert ids == expected
+
+
+def test_bad_cursor_is_rejected(client, group):
+    response = client.get(f"/api/groups/{group.id}/plans?cursor=no-es-un-cursor", headers=auth(group.admin_id))
+    assert response.status_code == 400
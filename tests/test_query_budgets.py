@@ -0,0 +1,97 @@
+"""Every route with a @query_budget stays within it on the seeded dataset; the dashboard matches its parts."""
+import pytest
+from sqlalchemy import func, select
+
+from api.models import db, Group, Plan, PlanOption, Vote, Expense, PlanMemory, group_members
+from api.nplusone import QueryBudgetExceeded
+from api.seed import seed
+
+from conftest import auth
+
+GROUP_ROUTES = ["/api/groups", "/api/groups/{gid}", "/api/groups/{gid}/plans", "/api/groups/{gid}/ledger",
+                "/api/groups/{gid}/hall-of-fame", "/api/groups/{gid}/stats", "/api/plans",
+                "/api/users/search?q=a&limit=50", "/api/users/search?q=ma&scope=groups"]
+PLAN_ROUTES  = {  # the plan with the most of these rows, so loops run over many children
+    PlanOption: ["/api/plans/{pid}", "/api/plans/{pid}/options", "/api/plans/{pid}/dashboard"],
+    Vote:       ["/api/plans/{pid}/votes"],
+    Expense:    ["/api/plans/{pid}/expenses", "/api/plans/{pid}/expenses/summary"],
+    PlanMemory: ["/api/plans/{pid}/memories"],
+}
+
+
+@pytest.fixture
+def seeded(app):
+    """The seed with its biggest group, and for each child model the plan that has the most of it."""
+    seed(1)
+    gid   = db.session.scalar(select(group_members.c.group_id).group_by(group_members.c.group_id)
+                              .order_by(func.count().desc()).limit(1))
+    plans = {model: db.session.execute(select(Plan.id, Plan.admin_id).join(model, model.plan_id == Plan.id)
+                                       .group_by(Plan.id).order_by(func.count().desc(), Plan.id).limit(1)).one()
+             for model in PLAN_ROUTES}
+    group = (gid, db.session.get(Group, gid).admin_id)
+    # Requests share the test's session: start them without these objects in its identity map
+    db.session.remove()
+    return group, plans
+
+
+def test_group_routes_stay_within_budget(client, seeded):
+    (gid, admin_id), _ = seeded
+    for url in GROUP_ROUTES:
+        response = client.get(url.format(gid=gid), headers=auth(admin_id))
+        assert response.status_code == 200, url
+
+
+def test_plan_routes_stay_within_budget(client, seeded):
+    _, plans = seeded
+    for model, urls in PLAN_ROUTES.items():
+        plan_id, admin_id = plans[model]
+        for url in urls:
+            response = client.get(url.format(pid=plan_id), headers=auth(admin_id))
+            assert response.status_code == 200, url
+
+
+def test_votes_stay_within_budget(client, seeded):
+    plan_id, admin_id = seeded[1][PlanOption]
+    option_id         = db.session.scalar(select(PlanOption.id).where(PlanOption.plan_id == plan_id).limit(1))
+    db.session.remove()
+    for body in ({"vote_type": "si"}, {"vote_type": "no"}, {"vote_type": "si", "option_id": option_id}):
+        response = client.post(f"/api/plans/{plan_id}/vote", headers=auth(admin_id), json=body)
+        assert response.status_code < 400, body
+
+
+def test_going_over_budget_fails(client, seeded, monkeypatch):
+    monkeypatch.setattr(client.application.view_functions["api.get_groups"], "query_budget", 0)
+    with pytest.raises(QueryBudgetExceeded):
+        client.get("/api/groups", headers=auth(seeded[0][1]))
+
+
+@pytest.fixture
+def full_plan(seeded):
+    """A seeded plan with options, votes, expenses and memories, and its admin."""
+    has  = [select(model.id).where(model.plan_id == Plan.id).exists() for model in PLAN_ROUTES]
+    plan = db.session.execute(select(Plan.id, Plan.admin_id).where(*has).order_by(Plan.id).limit(1)).one()
+    db.session.remove()
+    return plan
+
+
+def test_dashboard_sections_match_their_endpoints(client, full_plan, count_queries):
+    plan_id, admin_id = full_plan
+    headers           = auth(admin_id)
+    with count_queries() as queries:
+        dashboard = client.get(f"/api/plans/{plan_id}/dashboard", headers=headers).get_json()
+    assert len(queries) == 7  # ETag version check, plan, options, votes, expenses, splits, memories
+    assert list(dashboard) == ["expenses", "memories", "options", "plan", "summary", "votes"]
+    assert all(dashboard[section] for section in dashboard)
+    for section, url in [("plan", ""), ("options", "/options"), ("votes", "/votes"), ("expenses", "/expenses"),
+                         ("summary", "/expenses/summary"), ("memories", "/memories")]:
+        assert client.get(f"/api/plans/{plan_id}{url}", headers=headers).get_json() == dashboard[section], section
+
+
+def test_dashboard_include_loads_only_those_sections(client, full_plan, count_queries):
+    plan_id, admin_id = full_plan
+    with count_queries() as queries:
+        response = client.get(f"/api/plans/{plan_id}/dashboard?include=votes,summary", headers=auth(admin_id))
+    assert list(response.get_json()) == ["summary", "votes"]
+    assert len(queries) == 5  # summary still needs the expenses and their splits
+    response = client.get(f"/api/plans/{plan_id}/dashboard?include=votes,fotos", headers=auth(admin_id))
+    assert response.status_code == 400
@@ -0,0 +1,35 @@
+"""Plan endpoints run a fixed number of statements, however many plans they return."""
+from api.models import db, Plan
+
+from conftest import auth
+
+
+def test_plan_lists_do_not_lazy_load(client, group, count_queries):
+    headers = auth(group.admin_id)
+    for url in ("/api/plans", f"/api/groups/{group.id}/plans"):
+        with count_queries() as queries:
+            response = client.get(url, headers=headers)
+        assert response.status_code == 200
+        assert len(response.get_json()) == 12
+        assert all(plan["organizer_username"] for plan in response.get_json())
+        assert len(queries) == 1, url
+
+
+def test_plan_list_count_does_not_grow_with_rows(client, group, count_queries):
+    group_id, headers = group.id, auth(group.admin_id)
+    db.session.add_all([Plan(title=f"Extra {i}", group_id=group_id, admin_id=group.admin_id,
+                             organizer_id=group.members[i % 4].id) for i in range(30)])
+    db.session.commit()
+    with count_queries() as queries:
+        response = client.get(f"/api/groups/{group_id}/plans", headers=headers)
+    assert len(response.get_json()) == 42
+    assert len(queries) == 1
+
+
+def test_plan_detail(client, group, count_queries):
+    plan_id = group.plans[0].id
+    with count_queries() as queries:
+        response = client.get(f"/api/plans/{plan_id}", headers=auth(group.admin_id))
+    assert response.status_code == 200
+    assert response.get_json()["admin_username"]
+    assert len(queries) == 2  # ETag version check + the plan with organizer and admin
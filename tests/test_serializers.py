@@ -0,0 +1,36 @@
+"""json_response() writes exactly the bytes jsonify() does, orjson or not."""
+import pytest
+from flask import jsonify
+
+from api import serializers
+from api.models import Plan
+from api.queries import plan_query
+from api.serializers import dumps, json_response, serialize_all
+
+PAYLOADS = [
+    {"title": "Cena en Logroño 😀", "control": "\x01\x7f", "escapes": "\\ñ \\xf1 \\U0001f600 \"q\"", "sep": " "},
+    {"tiny": 1e-05, "huge": 1e20, "nan": float("nan"), "inf": float("inf"), "plain": [0.1, 2.5, -0.0]},
+    {"big_int": 10 ** 30, "nested": {"balance": 3.552713678800501e-15}},
+]
+
+
+@pytest.fixture(params=["orjson", "stdlib"])
+def backend(request, monkeypatch):
+    if request.param == "stdlib":
+        monkeypatch.setattr(serializers, "orjson", None)
+    elif serializers.orjson is None:
+        pytest.skip("orjson is not installed")
+
+
+@pytest.mark.parametrize("payload", PAYLOADS)
+def test_payloads_match_jsonify(app, backend, payload):
+    with app.test_request_context():
+        assert dumps(payload) + b"\n" == jsonify(payload).get_data()
+
+
+def test_schema_rows_match_serialize(app, backend, group):
+    plans = plan_query("plan_list").all()
+    plans[0].title, plans[1].rating = "Excursión a Navacerrada ⛰", 1e-05
+    with app.test_request_context():
+        body = json_response({"items": serialize_all(Plan, plans), "next_cursor": None}).get_data()
+        assert body == jsonify({"items": [plan.serialize() for plan in plans], "next_cursor": None}).get_data()
@@ -0,0 +1,59 @@
+"""The vote counters kept with UPDATE col = col + 1 match a rebuild from the vote table."""
+from sqlalchemy import select
+
+from api.models import db, Plan, PlanOption, Vote, VoteType
+from api.tallies import TALLY_COLUMNS, record_vote, rebuild_tallies
+
+from conftest import auth
+
+
+def tallies(plan_id):
+    columns = [getattr(PlanOption, col) for col in TALLY_COLUMNS.values()]
+    options = db.session.execute(select(PlanOption.id, *columns).where(PlanOption.plan_id == plan_id)
+                                 .order_by(PlanOption.id)).all()
+    plan    = db.session.execute(select(*(getattr(Plan, col) for col in TALLY_COLUMNS.values()), Plan.version)
+                                 .where(Plan.id == plan_id)).one()
+    return tuple(plan), [tuple(row) for row in options]
+
+
+def test_votes_match_a_rebuild(client, group):
+    plan_id = group.plans[0].id
+    users   = [member.id for member in group.members]
+    db.session.add_all([PlanOption(plan_id=plan_id, title=title) for title in ("Tapas", "Sushi")])
+    db.session.commit()
+    options = list(db.session.scalars(select(PlanOption.id).where(PlanOption.plan_id == plan_id)))
+    db.session.remove()
+
+    def vote(user_id, vote_type, option_id=None):
+        response = client.post(f"/api/plans/{plan_id}/vote", headers=auth(user_id),
+                               json={"vote_type": vote_type, "option_id": option_id})
+        assert response.status_code == 200
+
+    for i, user_id in enumerate(users):                        # new votes
+        vote(user_id, ("si", "no", "me_da_igual", "si")[i])
+        vote(user_id, ("si", "si", "no", "me_da_igual")[i], options[i % 2])
+    vote(users[1], "si")                                       # changed votes
+    vote(users[2], "me_da_igual", options[0])
+    vote(users[3], "me_da_igual")
+    for user_id, option_id in ((users[0], None), (users[1], options[1])):  # removed votes
+        removed = Vote.query.filter_by(plan_id=plan_id, user_id=user_id, option_id=option_id).one()
+        record_vote(plan_id, option_id, removed.vote_type, None)
+        db.session.delete(removed)
+    db.session.commit()
+
+    incremental = tallies(plan_id)
+    assert incremental[0][:3] == (2, 0, 4)  # the plan counts its options' votes too
+    assert incremental[1] == [(options[0], 1, 0, 1), (options[1], 0, 0, 1)]
+    rebuild_tallies()
+    assert tallies(plan_id) == incremental  # same counters, so the version (ETag) stays too
+
+
+def test_rebuild_fixes_drifted_counters(client, group):
+    plan_id = group.plans[0].id
+    client.post(f"/api/plans/{plan_id}/vote", headers=auth(group.admin_id), json={"vote_type": "no"})
+    db.session.execute(db.update(Plan).where(Plan.id == plan_id).values(votes_no=5, votes_si=2))
+    db.session.commit()
+    before = tallies(plan_id)[0]
+    rebuild_tallies()
+    after  = tallies(plan_id)[0]
+    assert after[:3] == (0, 1, 0) and after[3] == before[3] + 1
@@ -0,0 +1,84 @@
+"""The Ticketmaster client against the local fake provider: cache states, timeouts and upstream failures."""
+import time
+
+import pytest
+import requests
+
+from api.cache import TTLCache
+from api.fake_ticketmaster import start_fake_server
+from api.ticketmaster import EventSearch
+
+
+@pytest.fixture
+def provider():
+    """start(delay=0) -> (events URL, request counter); servers are shut down afterwards."""
+    servers = []
+
+    def start(delay=0.0):
+        server, url = start_fake_server(delay=delay)
+        servers.append(server)
+        return url, lambda: server.RequestHandlerClass.requests
+
+    yield start
+    for server in servers:
+        server.shutdown()
+        server.server_close()
+
+
+def stale_cache():
+    """Entries go stale after 10ms: the tests sleep past it instead of faking the clock."""
+    return TTLCache(16, 0.01, 60)
+
+
+def wait_for(condition, timeout=5):
+    deadline = time.monotonic() + timeout
+    while not condition():
+        assert time.monotonic() < deadline, "background refresh did not finish"
+        time.sleep(0.01)
+
+
+def test_fresh_entries_are_served_from_the_cache(provider):
+    url, requests_made = provider()
+    search = EventSearch(url, cache=TTLCache(16, 60))
+    events, state = search.search("key", "Madrid", "Jazz")
+    assert state == "miss" and len(events) == 3
+    assert events[0]["city"] == "madrid" and events[0]["price_range"] == "10€-30€"
+    assert search.search("key", " madrid ", "JAZZ") == (events, "hit")
+    assert requests_made() == 1
+    assert search.stats() == {"hits": 1, "stale_hits": 0, "misses": 1, "refreshes": 0, "errors": 0, "size": 1}
+
+
+def test_stale_entries_are_served_while_refreshing(provider):
+    url, requests_made = provider()
+    search = EventSearch(url, cache=stale_cache())
+    events, _ = search.search("key", "Bilbao")
+    time.sleep(0.02)
+    assert search.search("key", "Bilbao") == (events, "stale")
+    wait_for(lambda: search.metrics["refreshes"] == 1)
+    assert requests_made() == 2
+    assert search.metrics["stale_hits"] == 1 and search.metrics["errors"] == 0
+
+
+def test_a_miss_makes_a_single_attempt_on_timeout(provider):
+    url, requests_made = provider(delay=0.5)
+    search = EventSearch(url, timeout=(1, 0.05), cache=TTLCache(16, 60))
+    started = time.monotonic()
+    with pytest.raises(requests.Timeout):
+        search.search("key", "Sevilla")
+    assert time.monotonic() - started < 0.4
+    assert requests_made() == 1
+    assert search.metrics["errors"] == 1 and len(search.cache) == 0
+
+
+def test_stale_data_is_kept_when_upstream_fails(provider):
+    url, _ = provider()
+    search = EventSearch(url, cache=stale_cache())
+    events, _ = search.search("key", "Valencia")
+    time.sleep(0.02)
+    search.base_url, requests_made = provider(delay=0.5)
+    search.timeout = (1, 0.05)
+    assert search.search("key", "Valencia") == (events, "stale")
+    wait_for(lambda: search.metrics["errors"] == 1)
+    assert requests_made() == 3  # the refresh retries; the request itself never waited
+    assert search.metrics["refreshes"] == 0
+    assert search.search("key", "Valencia") == (events, "stale")
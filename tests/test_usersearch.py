@@ -0,0 +1,57 @@
+"""Username autocomplete ranks exact, prefix then substring matches, in SQL and in the in-process index."""
+import pytest
+
+from api.models import db, User, Group
+from api.usersearch import sql_search_query
+
+from conftest import auth
+
+NAMES   = ["juliana", "dan", "ana_maria", "Ana", "mariana", "anabel", "banana", "anna"]
+RANKING = ["Ana", "anabel", "ana_maria", "banana", "juliana", "mariana"]
+
+
+@pytest.fixture
+def users(app):
+    """Users by name; "Ana" shares a group with anabel and mariana only."""
+    users = {name: User(email=f"{name}@test.com", username=name, password="x") for name in NAMES}
+    db.session.add_all(users.values())
+    db.session.flush()
+    group = Group(name="Vecinas", admin_id=users["Ana"].id)
+    group.members.extend([users["Ana"], users["anabel"], users["mariana"]])
+    db.session.add(group)
+    db.session.commit()
+    ids = {name: user.id for name, user in users.items()}
+    db.session.remove()
+    return ids
+
+
+def search(client, user_id, **params):
+    response = client.get("/api/users/search", headers=auth(user_id), query_string=params)
+    assert response.status_code == 200
+    return [user["username"] for user in response.get_json()]
+
+
+def test_index_ranks_exact_then_prefix_then_substring(client, users):
+    assert search(client, users["dan"], q="ANA") == RANKING
+    assert search(client, users["dan"], q="ana", limit=2) == RANKING[:2]
+    assert search(client, users["dan"], q="an") == ["Ana", "anna", "anabel", "ana_maria"]  # no substrings under 3
+
+
+def test_index_ranks_users_created_since_it_was_built(client, users):
+    assert search(client, users["dan"], q="ana") == RANKING
+    db.session.add_all([User(email="x@test.com", username="anastasia", password="x"),
+                        User(email="y@test.com", username="diana", password="x")])
+    db.session.commit()
+    db.session.remove()
+    assert search(client, users["dan"], q="ana") == RANKING[:3] + ["anastasia", "diana"] + RANKING[3:]
+
+
+def test_group_scope_only_returns_shared_members(client, users):
+    assert search(client, users["Ana"], q="ana", scope="groups") == ["Ana", "anabel", "mariana"]
+    assert search(client, users["dan"], q="ana", scope="groups") == []
+
+
+def test_sql_ranking_matches_the_index(app, users):
+    assert [u.username for u in sql_search_query("ana", 10)] == RANKING
+    assert [u.username for u in sql_search_query("a_a", 10)] == []  # "_" is not a wildcard
+    assert [u.username for u in sql_search_query("ana", 10, users["Ana"])] == ["Ana", "anabel", "mariana"]